@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for batched retrieval against the vector database.
+Reads the configured persist directory (run build_database.py first) and needs the
+CLIP weights; run it directly: python benchmarks/bench_retrieval.py
+"""
+
+import sys
+import time
+import numpy as np
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dataroom.rag.build_database import get_db_manager
+
+TEST_QUERIES = [
+    "What is the total purchase price?",
+    "Which properties are located in Berlin?",
+    "What is the average rent per square meter?",
+    "Who is the seller of the portfolio?",
+    "What is the occupancy rate of the buildings?",
+    "When does the lease agreement expire?",
+    "What is the year of construction?",
+    "How many residential units are there?",
+]
+
+
+def bench_batched_retrieval(top_k: int = 5, n_random: int = 256):
+    """Query both collections with one batched call per collection and report throughput."""
+    print("\n" + "="*50)
+    print("Testing Batched Retrieval")
+    print("="*50)
+
+    db_manager = get_db_manager()
+    stats = db_manager.get_collection_stats()
+    if stats["total_chunks"] == 0:
+        print("❌ Database is empty, run build_database.py first")
+        return False
+
+    # One forward pass for all test queries
+    start = time.perf_counter()
+    query_embeddings = np.asarray(db_manager.embedder.embed(TEST_QUERIES), dtype=np.float32)
+    embed_time = time.perf_counter() - start
+    print(f"✅ Embedded {len(TEST_QUERIES)} queries in {embed_time * 1000:.1f} ms")
+
+    for name, collection in (("PDF", db_manager.pdf_collection), ("CSV", db_manager.csv_collection)):
+        if collection.count() == 0:
+            print(f"⚠️  {name} collection is empty, skipping")
+            continue
+
+        start = time.perf_counter()
+        search_results = collection.query(
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+            include=["distances"]
+        )
+        query_time = time.perf_counter() - start
+        distances = np.asarray(search_results["distances"], dtype=np.float32)
+        print(f"✅ {name}: {len(TEST_QUERIES)} queries in {query_time * 1000:.1f} ms "
+              f"({len(TEST_QUERIES) / query_time:.0f} q/s), "
+              f"mean top-1 distance {distances[:, 0].mean():.4f}")
+
+        # Random unit-norm probes in the CLIP space stress the index without the encoder
+        probes = np.random.rand(n_random, query_embeddings.shape[1]).astype(np.float32)
+        probes /= np.linalg.norm(probes, axis=1, keepdims=True)
+        start = time.perf_counter()
+        collection.query(query_embeddings=probes, n_results=top_k, include=["distances"])
+        probe_time = time.perf_counter() - start
+        print(f"   {n_random} random probes in {probe_time * 1000:.1f} ms "
+              f"({n_random / probe_time:.0f} q/s)")
+
+    return True
+
+
+def main():
+    """Run the benchmark."""
+    print("Vector Database Benchmark")
+    print("=" * 50)
+
+    ok = bench_batched_retrieval()
+
+    print("\n" + "="*50)
+    print(f"Batched Retrieval: {'✅' if ok else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 """Agent module for real estate document analysis."""
 
 from .agent import Agent, AgentState, ToolCallLog
+from .exec_cache import ExecCache
 
-__all__ = ["Agent", "AgentState", "ToolCallLog"]
+__all__ = ["Agent", "AgentState", "ToolCallLog", "ExecCache"]
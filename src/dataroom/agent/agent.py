@@ -83,6 +83,9 @@ class Agent:
             log_dir (str, optional): Directory to save logs. Defaults to 'logs'.
         """
         self.system_prompt = system_prompt
+        # Built once: every request starts with the same system prefix, which Gemini
+        # 2.5 models cache implicitly across calls
+        self._system_message = SystemMessage(content=system_prompt) if system_prompt else None
         self.log_tools = log_tools
 
         if self.log_tools:
@@ -114,8 +117,8 @@ class Agent:
             Dict[str, List[AnyMessage]]: A dictionary containing the model's response.
         """
         messages = state["messages"]
-        if self.system_prompt:
-            messages = [SystemMessage(content=self.system_prompt)] + messages
+        if self._system_message is not None:
+            messages = [self._system_message] + messages
         response = self.model.invoke(messages)
         return {"messages": [response]}
 
@@ -0,0 +1,91 @@
+"""
+Persistent cache of final agent answers.
+Keyed by the question, the recent conversation, the model / system prompt and a
+fingerprint of the stored documents, so recurring questions skip the whole agent
+workflow until any of these changes.
+"""
+
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+
+class ExecCache:
+    """SQLite-backed cache mapping sha256(question, thread, model, document signature) to an answer."""
+
+    def __init__(self, db_path: str):
+        """Open (or create) the cache database.
+
+        Args:
+            db_path: path of the SQLite file holding the cache
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=normal")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, answer TEXT NOT NULL, ts REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def thread_signature(messages: Sequence[Any], last_n: int = 6) -> str:
+        """Fingerprint of the last ``last_n`` messages of a conversation ("" for a new one).
+
+        Follow-up questions ("what about the second one?") depend on these turns, so
+        they are part of the key.
+        """
+        digest = hashlib.sha256()
+        for message in list(messages)[-last_n:]:
+            digest.update(f"{getattr(message, 'type', '')}\0{getattr(message, 'content', '')}\0".encode("utf-8"))
+        return digest.hexdigest() if messages else ""
+
+    @staticmethod
+    def model_signature(model: Any, system_prompt: str = "") -> str:
+        """Fingerprint of the chat model settings and the system prompt.
+
+        Tool-bound models (``model.bind_tools``) are unwrapped to the underlying model.
+        """
+        model = getattr(model, "bound", model)
+        params = {
+            name: getattr(model, name, None)
+            for name in ("model", "model_name", "temperature", "top_p", "top_k", "max_output_tokens")
+        }
+        state = json.dumps([type(model).__name__, params, system_prompt], sort_keys=True, default=str)
+        return hashlib.sha256(state.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def key(message: str, doc_signature: str, thread_signature: str = "", model_signature: str = "") -> str:
+        """Cache key of a question asked in a given conversation, to a given model, against a given document set."""
+        normalized = message.strip().lower()
+        return hashlib.sha256(
+            f"{model_signature}\0{doc_signature}\0{thread_signature}\0{normalized}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[str]:
+        """Return the cached answer, or None if missing or older than max_age seconds."""
+        with self._lock:
+            row = self._conn.execute("SELECT answer, ts FROM answers WHERE key = ?", (key,)).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return row[0]
+
+    def put(self, key: str, answer: str) -> None:
+        """Store (or replace) the answer for key."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (key, answer, ts) VALUES (?, ?, ?)",
+                (key, answer, time.time())
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -2,10 +2,32 @@
 RAG (Retrieval-Augmented Generation) module for document processing.
 """
 
-from .embedder import DocumentEmbedder
-from .chunks import DocumentChunker
+import importlib
+
+# Submodules are imported on first attribute access (PEP 562): the embedder pulls in
+# torch / transformers, which importing any other rag submodule should not load.
+_LAZY = {
+    "DocumentEmbedder": ".embedder",
+    "get_embedder": ".embedder",
+    "DocumentChunker": ".chunks",
+    "ChunksBatch": ".chunks",
+    "encode_metadata": ".chunks",
+    "decode_metadata": ".chunks",
+}
 
 __all__ = [
     "DocumentEmbedder",
+    "get_embedder",
     "DocumentChunker", 
+    "ChunksBatch",
+    "encode_metadata",
+    "decode_metadata",
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,16 +4,90 @@ Implements dual database architecture with CLIP embeddings.
 """
 
 import os
-import yaml
+import json
+import queue
+import asyncio
+import hashlib
+import functools
+import threading
+import multiprocessing
+import numpy as np
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Tuple, TYPE_CHECKING
 from pathlib import Path
 from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from .chunks import DocumentChunker, ChunksBatch, META_SCHEMA_VERSION, encode_metadata, decode_metadata
+from .embed_cache import EmbedCache
+from .faiss_backend import wrap_collection
+from .config import get_rag_config, get_vector_store_config
+
+if TYPE_CHECKING:
+    from .embedder import DocumentEmbedder
+
+
+def _parser():
+    """Import the document parser on first use (pulls in pandas / PyMuPDF4LLM)."""
+    from ..tools import parser
+    return parser
+
+
+def file_document_id(file_path: str, prefix: str) -> str:
+    """Deterministic document ID derived from the file contents.
+
+    Re-ingesting an unchanged file yields the same chunk IDs, so upserts are idempotent.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return f"{prefix}_{digest.hexdigest()}"
+
+
+def _parse_and_chunk(file_path: str, document_id: str, upload_time: Optional[str] = None) -> Dict[str, Any]:
+    """Parse and chunk a single PDF / CSV file.
+
+    Module-level so it can run in a worker process of ``ingest_many``.
+
+    Returns:
+        Dict with file_type, document_id, doc_metadata and the prepared
+        (ids, documents, metadatas) lists, or an "error" key
+    """
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".pdf":
+        parse_result = _parser().parse_pdf(file_path, max_workers=1)
+        if "error" in parse_result:
+            return {"error": f"Failed to parse PDF: {parse_result['error']}"}
+        doc_metadata = VectorDatabaseManager._pdf_doc_metadata(file_path, parse_result, document_id, upload_time=upload_time)
+        chunker = DocumentChunker()
+        chunker_fn = lambda result, meta: chunker.chunk_pdf_pages(result.get("page_chunks", []), meta)
+    elif suffix == ".csv":
+        parse_result = _parser().parse_csv(file_path, include_markdown=False)
+        if "error" in parse_result:
+            return {"error": f"Failed to parse CSV: {parse_result['error']}"}
+        doc_metadata = VectorDatabaseManager._csv_doc_metadata(file_path, parse_result, document_id, upload_time=upload_time)
+        chunker = DocumentChunker()
+        chunker_fn = lambda result, meta: (
+            chunker.chunk_csv_dataframe(result["dataframe"], meta)
+            if result.get("dataframe") is not None
+            else chunker.chunk_csv_markdown(result.get("markdown_content", ""), meta)
+        )
+    else:
+        return {"error": f"Unsupported file type: {suffix}"}
+
+    prepared = VectorDatabaseManager._prepare_chunks(parse_result, doc_metadata, chunker_fn)
+    if not prepared[0]:
+        return {"error": "No chunks generated"}
+    return {
+        "file_type": suffix[1:],
+        "document_id": document_id,
+        "doc_metadata": doc_metadata,
+        "prepared": prepared
+    }
 
-from .embedder import DocumentEmbedder
-from .chunks import DocumentChunker
-from ..tools import parser
 
 class VectorDatabaseManager:
     """
@@ -21,136 +95,203 @@ class VectorDatabaseManager:
     Uses the CLIP embedding model for text vectorization.
     """
     
+    __slots__ = (
+        "config", "cfg", "chunker", "embed_cache", "client",
+        "pdf_collection", "csv_collection",
+        "_embedder", "_embed_query", "_embedding_dtype", "_db_path", "_is_async",
+        "_manifest_path", "_manifest_lock", "_generation",
+    )
+    
     def __init__(self):
         """Initialize the database manager."""
-        # Load settings from YAML configuration file
-        config_path = Path(__file__).parent / "rag_config.yaml"
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
-        
-        vector_config = self.config["vector_store_config"]
+        self._init_components()
         
-    # Initialize embedder and chunker
-        self.embedder = DocumentEmbedder()
-        self.chunker = DocumentChunker()
-        
-    # Initialize PDF database client
-        pdf_db_path = vector_config["pdf_database"]["persist_directory"]
-        self.pdf_client = chromadb.PersistentClient(
-            path=pdf_db_path,
+    # Single persistent client holding both collections (one SQLite store / WAL)
+        db_path = self.cfg.persist_directory
+        self.client = chromadb.PersistentClient(
+            path=db_path,
             settings=Settings(
                 anonymized_telemetry=False,
                 allow_reset=True
             )
         )
         
-    # Initialize CSV database client
-        csv_db_path = vector_config["csv_database"]["persist_directory"]
-        self.csv_client = chromadb.PersistentClient(
-            path=csv_db_path,
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-        )
+    # Build mode: speed up SQLite writes on the persistent store
+        if self.cfg.sqlite_build_mode:
+            self._tune_sqlite(self.client)
         
     # Create collections
-        self.pdf_collection = self.pdf_client.get_or_create_collection(
-            name=vector_config["pdf_database"]["collection_name"],
-            metadata={"description": "PDF documents with page-level chunks"}
+        self.pdf_collection = self._open_collection(
+            self.cfg.pdf_database.collection_name, "PDF documents with page-level chunks"
         )
         
-        self.csv_collection = self.csv_client.get_or_create_collection(
-            name=vector_config["csv_database"]["collection_name"], 
-            metadata={"description": "CSV documents with row-level chunks"}
+        self.csv_collection = self._open_collection(
+            self.cfg.csv_database.collection_name, "CSV documents with row-level chunks"
         )
         
+        self._db_path = db_path
+        self._is_async = False
+        
+    # Per-file manifest so list_documents does not scan every chunk's metadata
+        self._manifest_path = Path(db_path) / "manifest.json"
+        if not self._manifest_path.exists() and self.pdf_collection.count() == 0 and self.csv_collection.count() == 0:
+            self._save_manifest({"pdf": {}, "csv": {}})
+        
         print("✅ VectorDatabaseManager initialized with CLIP embeddings")
-        print(f"   📁 PDF Database: {pdf_db_path}")
-        print(f"   📁 CSV Database: {csv_db_path}")
+        print(f"   📁 Database: {db_path}")
         print(f"   🧠 Embedding Model: CLIP (512 dimensions)")
     
+    def _init_components(self) -> None:
+        """Load configuration and set up the embedder, chunker and caches."""
+        # Shared, process-wide configuration (parsed once, read-only)
+        self.config = get_rag_config()
+        self.cfg = get_vector_store_config()
+        
+    # Initialize embedder and chunker
+        self._embedder: Optional["DocumentEmbedder"] = None
+        self.chunker = DocumentChunker()
+        embed_config = self.config["model_config"]["embedding_model"]
+        self._embedding_dtype = np.dtype(self.cfg.embedding_dtype)
+        # Stored in the embedding dtype, so cached and fresh vectors are identical
+        self.embed_cache = EmbedCache(
+            self.cfg.embedding_cache_path,
+            namespace=f"{embed_config.get('name', '')}:{embed_config.get('precision', 'auto')}",
+            dtype=self._embedding_dtype
+        )
+        # Repeated chat queries skip the CLIP forward pass
+        self._embed_query = functools.lru_cache(maxsize=1024)(self._embed_query_uncached)
+        self._manifest_lock = threading.Lock()
+        # Bumped by every write path; see change_token
+        self._generation = 0
+
+    @property
+    def embedder(self) -> "DocumentEmbedder":
+        """CLIP embedder, imported and constructed on first use (torch / transformers)."""
+        if self._embedder is None:
+            from .embedder import get_embedder
+            self._embedder = get_embedder()
+        return self._embedder
+
+    @classmethod
+    async def from_http(cls, host: str = "localhost", port: int = 8000) -> "VectorDatabaseManager":
+        """Create a manager backed by a Chroma server through ``chromadb.AsyncHttpClient``.
+
+        Writes are awaited (see ``aadd_pdf_document`` / ``aadd_csv_document``), so the
+        caller's event loop keeps embedding while Chroma commits. The sync ``add_*``
+        methods remain available as ``asyncio.run`` shims; search, stats and listing
+        still expect the in-process persistent client.
+
+        Args:
+            host: Chroma server host
+            port: Chroma server port
+        """
+        self = cls.__new__(cls)
+        self._init_components()
+        
+        client = await chromadb.AsyncHttpClient(host=host, port=port)
+        self.client = client
+        self.pdf_collection = await client.get_or_create_collection(
+            name=self.cfg.pdf_database.collection_name,
+            metadata=self._collection_metadata("PDF documents with page-level chunks")
+        )
+        self.csv_collection = await client.get_or_create_collection(
+            name=self.cfg.csv_database.collection_name,
+            metadata=self._collection_metadata("CSV documents with row-level chunks")
+        )
+        self._db_path = f"http://{host}:{port}"
+        self._is_async = True
+        # The server's contents can change under us; always list by scanning
+        self._manifest_path = None
+        
+        print(f"✅ VectorDatabaseManager connected to Chroma server at {host}:{port}")
+        return self
+
+    def _open_collection(self, name: str, description: str):
+        """Get or create a persistent collection; search goes through FAISS when
+        ``DATAROOM_VECTOR_BACKEND=faiss`` (see faiss_backend)."""
+        collection = self.client.get_or_create_collection(
+            name=name,
+            metadata=self._collection_metadata(description)
+        )
+        # Existing collections keep the metadata they were created with
+        schema = (collection.metadata or {}).get("meta_schema")
+        if schema != META_SCHEMA_VERSION:
+            print(f"⚠️ Collection '{name}' uses metadata schema {schema} (expected {META_SCHEMA_VERSION}); "
+                  f"document-id filters may miss its chunks, reset and re-ingest to upgrade")
+        return wrap_collection(collection, change_token=self.change_token)
+
+    def _collection_metadata(self, description: str) -> Dict[str, Any]:
+        """Collection metadata carrying the configured HNSW index parameters.
+
+        Smaller ``M`` / ``construction_ef`` make inserts cheaper and the graph smaller
+        at a slight recall cost, which a higher query-time ``search_ef`` compensates.
+        Chroma fixes these at collection creation; existing collections keep theirs.
+        """
+        hnsw_config = self.cfg.hnsw
+        metadata = {"description": description, "meta_schema": META_SCHEMA_VERSION}
+        for key in ("space", "M", "construction_ef", "search_ef"):
+            if key in hnsw_config:
+                metadata[f"hnsw:{key}"] = hnsw_config[key]
+        return metadata
+
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Embed chunk texts through the content-hash cache, cast to the storage dtype.
+
+        Chroma's HNSW index and SQLite queue keep float32 internally, so a float16
+        ``embedding_dtype`` only halves the array handed across the client boundary.
+        The embedder and cache produce that dtype directly, without a float32 detour.
+        """
+        dtype = self._embedding_dtype
+        return self.embed_cache.get_or_compute(
+            texts, lambda misses: self.embedder.embed(misses, dtype=dtype), dtype=dtype
+        )
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed a search query, memoized on the exact query string.
+
+        Returns:
+            float32 vector of shape (D,); shared between callers, so read-only
+        """
+        return self._embed_query(query)
+
+    def _embed_query_uncached(self, query: str) -> np.ndarray:
+        embedding = self.embedder.embed(query)
+        embedding.flags.writeable = False
+        return embedding
+
+    @staticmethod
+    def _tune_sqlite(client) -> None:
+        """Apply write-friendly PRAGMAs to the SQLite store behind a PersistentClient.
+
+        WAL journaling with synchronous=NORMAL keeps crash safety while avoiding an
+        fsync per transaction. Chroma does not expose its connection publicly, so
+        this reaches into internals and silently keeps defaults if they change.
+        """
+        try:
+            sysdb = getattr(client, "_sysdb", None) or client._server._sysdb
+            conn = sysdb._conn_pool.connect()
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            conn.execute("pragma temp_store=memory")
+            conn.execute("pragma cache_size=-262144")
+        except AttributeError:
+            pass
+    
     def add_pdf_document(self, 
                         file_path: str, 
                         document_id: Optional[str] = None,
                         metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Add PDF document to vector database - store using page_chunks directly."""
+        if self._is_async:
+            return asyncio.run(self.aadd_pdf_document(file_path, document_id, metadata))
         try:
-            print(f"📄 Processing PDF document: {file_path}")
-            
-            # Parse PDF document
-            parse_result = parser.parse_pdf(file_path)
-            if "error" in parse_result:
-                return {"error": f"Failed to parse PDF: {parse_result['error']}"}
-            
-            # Get page chunks
-            page_chunks = parse_result.get("page_chunks", [])
-            if not page_chunks:
-                return {"error": "No page chunks found in parse result"}
-            
-            # Generate document ID
-            if not document_id:
-                document_id = f"pdf_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            
-            # Prepare document metadata
-            doc_metadata = {
-                "document_id": document_id,
-                "filename": parse_result.get("filename", "unknown.pdf"),
-                "file_type": "pdf",
-                "file_path": file_path,
-                "upload_time": datetime.now().isoformat(),
-                "total_pages": len(page_chunks),
-                **(metadata or {})
-            }
-            
-            # Generate embedding for each page and store
-            ids = []
-            documents = []
-            embeddings = []
-            metadatas = []
-            
-            for page_chunk in page_chunks:
-                # Generate page-level ID
-                page_id = f"{document_id}_page_{page_chunk['metadata']['page']}"
-                
-                # Generate embedding vector
-                text_content = page_chunk["text"]
-                embedding = self.embedder.embed(text_content)
-                
-                # Prepare per-page metadata
-                page_metadata = {
-                    "document_id": document_id,
-                    "filename": doc_metadata["filename"],
-                    "page_number": page_chunk["metadata"]["page"],
-                    "file_type": "pdf",
-                    "chunk_type": "page",
-                    "upload_time": doc_metadata["upload_time"]
-                }
-                
-                ids.append(page_id)
-                documents.append(text_content)
-                embeddings.append(embedding)
-                metadatas.append(page_metadata)
+            prepared = self._prepare_pdf(file_path, document_id, metadata)
+            if "error" in prepared:
+                return prepared
             
             # Batch add to PDF collection
-            self.pdf_collection.add(
-                ids=ids,
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas
-            )
-            
-            result = {
-                "status": "success",
-                "document_id": document_id,
-                "database": "pdf_db",
-                "collection": "pdf_documents",
-                "pages_added": len(page_chunks),
-                "metadata": doc_metadata
-            }
-            
-            print(f"✅ PDF document added to pdf_db: {len(page_chunks)} pages")
-            return result
+            self._add_in_batches(self.pdf_collection, prepared["records"])
+            return self._pdf_result(prepared)
             
         except Exception as e:
             return {"error": f"Error adding PDF document: {str(e)}"}
@@ -160,90 +301,601 @@ class VectorDatabaseManager:
                         document_id: Optional[str] = None,
                         metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Add CSV document to vector database - split by rows using chunker."""
+        if self._is_async:
+            return asyncio.run(self.aadd_csv_document(file_path, document_id, metadata))
         try:
-            print(f"📊 Processing CSV document: {file_path}")
-            
-            # Parse CSV document
-            parse_result = parser.parse_csv(file_path)
-            if "error" in parse_result:
-                return {"error": f"Failed to parse CSV: {parse_result['error']}"}
-            
-            # Generate document ID
-            if not document_id:
-                document_id = f"csv_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            
-            # Prepare document metadata
-            doc_metadata = {
-                "document_id": document_id,
-                "filename": parse_result.get("filename", "unknown.csv"),
-                "file_type": "csv",
-                "file_path": file_path,
-                "upload_time": datetime.now().isoformat(),
-                "rows": parse_result.get("rows", 0),
-                "columns": parse_result.get("columns", 0),
-                **(metadata or {})
-            }
-            print(doc_metadata)
-            # Get markdown content
-            markdown_content = parse_result.get("markdown_content", "")
-            if not markdown_content:
-                return {"error": "No markdown content found in parse result"}
-            
-            # Chunk content
-            chunks = self.chunker.chunk_csv_markdown(markdown_content, doc_metadata)
+            parsed = self._parse_csv(file_path, document_id, metadata)
+            if "error" in parsed:
+                return parsed
             
-            if not chunks:
-                return {"error": "No chunks generated from CSV"}
+            # Stream DataFrame rows into the CSV collection window by window
+            df = parsed["parse_result"].get("dataframe")
+            if df is not None:
+                return self._stream_csv(df, parsed["document_id"], parsed["doc_metadata"])
             
-            # Generate embeddings
-            texts = [chunk["content"] for chunk in chunks]
-            embeddings = self.embedder.embed(texts)
-            
-            # Prepare ChromaDB data
-            ids = [chunk["chunk_id"] for chunk in chunks]
-            documents = [chunk["content"] for chunk in chunks]
-            metadatas = [chunk["metadata"] for chunk in chunks]
+            prepared = self._prepare_csv(file_path, parsed=parsed)
+            if "error" in prepared:
+                return prepared
             
             # Add to CSV collection
-            self.csv_collection.add(
-                ids=ids,
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas
-            )
-            
-            result = {
-                "status": "success",
-                "document_id": document_id,
-                "database": "csv_db",
-                "collection": "csv_documents",
-                "chunks_added": len(chunks),
-                "metadata": doc_metadata
-            }
-            
-            print(f"✅ CSV document added to csv_db: {len(chunks)} chunks")
-            return result
+            self._add_in_batches(self.csv_collection, prepared["records"])
+            return self._csv_result(prepared)
             
         except Exception as e:
             return {"error": f"Error adding CSV document: {str(e)}"}
+
+    async def aadd_pdf_document(self,
+                                file_path: str,
+                                document_id: Optional[str] = None,
+                                metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of ``add_pdf_document``; parsing/embedding run in a worker thread."""
+        try:
+            prepared = await asyncio.to_thread(self._prepare_pdf, file_path, document_id, metadata)
+            if "error" in prepared:
+                return prepared
+            await self._aupsert(self.pdf_collection, prepared["records"])
+            return self._pdf_result(prepared)
+        except Exception as e:
+            return {"error": f"Error adding PDF document: {str(e)}"}
+
+    async def aadd_csv_document(self,
+                                file_path: str,
+                                document_id: Optional[str] = None,
+                                metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async variant of ``add_csv_document``; parsing/embedding run in a worker thread."""
+        try:
+            prepared = await asyncio.to_thread(self._prepare_csv, file_path, document_id, metadata)
+            if "error" in prepared:
+                return prepared
+            await self._aupsert(self.csv_collection, prepared["records"])
+            return self._csv_result(prepared)
+        except Exception as e:
+            return {"error": f"Error adding CSV document: {str(e)}"}
+
+    async def _aupsert(self, collection, records: Dict[str, Any]) -> None:
+        """Await upserts on an async collection, or offload blocking ones to a thread.
+
+        Against a Chroma server the windows are sent concurrently; the embedded
+        client serializes writers anyway, so there they run one after another.
+        """
+        windows = self._record_windows(records, self.cfg.insert_batch_size)
+        if self._is_async:
+            await asyncio.gather(*(collection.upsert(**window) for window in windows))
+        else:
+            for window in windows:
+                await asyncio.to_thread(collection.upsert, **window)
+
+    def _add_in_batches(self,
+                        collection,
+                        records: Dict[str, Any],
+                        batch_size: Optional[int] = None) -> None:
+        """Upsert records in windows of ``insert_batch_size`` to bound memory per call."""
+        for window in self._record_windows(records, batch_size or self.cfg.insert_batch_size):
+            collection.upsert(**window)
+
+    @staticmethod
+    def _record_windows(records: Dict[str, Any], batch_size: int):
+        """Yield slices of the parallel ids/documents/embeddings/metadatas lists."""
+        total = len(records["ids"])
+        for start in range(0, total, batch_size):
+            yield {key: values[start:start + batch_size] for key, values in records.items()}
+
+    def _prepare_pdf(self,
+                     file_path: str,
+                     document_id: Optional[str] = None,
+                     metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Parse, chunk and embed a PDF into records ready for ``collection.upsert``."""
+        print(f"📄 Processing PDF document: {file_path}")
+        
+        # Parse PDF document
+        parse_result = _parser().parse_pdf(file_path)
+        if "error" in parse_result:
+            return {"error": f"Failed to parse PDF: {parse_result['error']}"}
+        
+        # Get page chunks
+        if not parse_result.get("page_chunks", []):
+            return {"error": "No page chunks found in parse result"}
+        
+        # Generate document ID
+        if not document_id:
+            document_id = file_document_id(file_path, "pdf")
+        
+        doc_metadata = self._pdf_doc_metadata(file_path, parse_result, document_id, metadata)
+        ids, documents, metadatas = self._prepare_chunks(
+            parse_result, doc_metadata, self._chunk_pdf_pages
+        )
+        
+        # One batched embedding call for all pages
+        embeddings = self._embed_texts(documents)
+        return {
+            "document_id": document_id,
+            "doc_metadata": doc_metadata,
+            "records": {
+                "ids": ids,
+                "documents": documents,
+                "embeddings": embeddings,
+                "metadatas": metadatas
+            }
+        }
+
+    def _parse_csv(self,
+                   file_path: str,
+                   document_id: Optional[str] = None,
+                   metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Parse a CSV and build its document-level metadata."""
+        print(f"📊 Processing CSV document: {file_path}")
+        
+        # Parse CSV document
+        parse_result = _parser().parse_csv(file_path, include_markdown=False)
+        if "error" in parse_result:
+            return {"error": f"Failed to parse CSV: {parse_result['error']}"}
+        
+        # Generate document ID
+        if not document_id:
+            document_id = file_document_id(file_path, "csv")
+        
+        return {
+            "parse_result": parse_result,
+            "document_id": document_id,
+            "doc_metadata": self._csv_doc_metadata(file_path, parse_result, document_id, metadata)
+        }
+
+    def _stream_csv(self,
+                    df,
+                    document_id: str,
+                    doc_metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Chunk, embed and upsert DataFrame rows in windows of ``insert_batch_size``.
+
+        A background writer upserts one window while the next is chunked and embedded,
+        so at most two windows of row chunks and embeddings are alive at a time.
+        """
+        batch_size = self.cfg.insert_batch_size
+        window = ChunksBatch()
+        chunks_added = 0
+        write = None
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="csv-write") as writer:
+            for chunk_id, content, chunk_metadata in self.chunker.iter_csv_dataframe(df, doc_metadata):
+                window.append(chunk_id, content, chunk_metadata)
+                if len(window) >= batch_size:
+                    write = self._submit_window(writer, write, window)
+                    chunks_added += len(window)
+                    window = ChunksBatch()
+            if len(window):
+                write = self._submit_window(writer, write, window)
+                chunks_added += len(window)
+            if write is not None:
+                write.result()
+        if not chunks_added:
+            return {"error": "No chunks generated from CSV"}
+        return self._csv_result({"document_id": document_id, "doc_metadata": doc_metadata}, chunks_added)
+
+    def _submit_window(self, writer: ThreadPoolExecutor, previous, window: ChunksBatch):
+        """Embed a window of CSV chunks, wait for the previous upsert, then queue this one."""
+        embeddings = self._embed_texts(window.contents)
+        if previous is not None:
+            previous.result()
+        return writer.submit(
+            self.csv_collection.upsert,
+            ids=window.ids,
+            documents=window.contents,
+            embeddings=embeddings,
+            metadatas=[encode_metadata(meta) for meta in window.metadatas]
+        )
+
+    def _prepare_csv(self,
+                     file_path: str,
+                     document_id: Optional[str] = None,
+                     metadata: Optional[Dict[str, Any]] = None,
+                     parsed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Parse, chunk and embed a CSV into records ready for ``collection.upsert``."""
+        if parsed is None:
+            parsed = self._parse_csv(file_path, document_id, metadata)
+            if "error" in parsed:
+                return parsed
+        parse_result = parsed["parse_result"]
+        document_id = parsed["document_id"]
+        doc_metadata = parsed["doc_metadata"]
+        
+        if parse_result.get("dataframe") is None and not parse_result.get("markdown_content", ""):
+            return {"error": "No markdown content found in parse result"}
+        
+        ids, documents, metadatas = self._prepare_chunks(
+            parse_result, doc_metadata, self._chunk_csv_rows
+        )
+        if not ids:
+            return {"error": "No chunks generated from CSV"}
+        
+        # Generate embeddings
+        embeddings = self._embed_texts(documents)
+        return {
+            "document_id": document_id,
+            "doc_metadata": doc_metadata,
+            "records": {
+                "ids": ids,
+                "documents": documents,
+                "embeddings": embeddings,
+                "metadatas": metadatas
+            }
+        }
+
+    def _pdf_result(self, prepared: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a PDF ingestion in the manifest and build its success result."""
+        pages_added = len(prepared["records"]["ids"])
+        doc_metadata = prepared["doc_metadata"]
+        self._update_manifest([("pdf", doc_metadata["filename"], prepared["document_id"], pages_added, doc_metadata["upload_time"])])
+        print(f"✅ PDF document added to pdf_db: {pages_added} pages")
+        return {
+            "status": "success",
+            "document_id": prepared["document_id"],
+            "database": "pdf_db",
+            "collection": "pdf_documents",
+            "pages_added": pages_added,
+            "metadata": prepared["doc_metadata"]
+        }
+
+    def _csv_result(self, prepared: Dict[str, Any], chunks_added: Optional[int] = None) -> Dict[str, Any]:
+        """Record a CSV ingestion in the manifest and build its success result."""
+        if chunks_added is None:
+            chunks_added = len(prepared["records"]["ids"])
+        doc_metadata = prepared["doc_metadata"]
+        self._update_manifest([("csv", doc_metadata["filename"], prepared["document_id"], chunks_added, doc_metadata["upload_time"])])
+        print(f"✅ CSV document added to csv_db: {chunks_added} chunks")
+        return {
+            "status": "success",
+            "document_id": prepared["document_id"],
+            "database": "csv_db",
+            "collection": "csv_documents",
+            "chunks_added": chunks_added,
+            "metadata": prepared["doc_metadata"]
+        }
+
+    def add_documents_bulk(self, file_list: List[str], batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """Ingest many PDF / CSV files with one embedding pass and batched adds per collection.
+
+        All chunks of the same type are accumulated across files, embedded in a single
+        ``embed`` call and written with ``collection.upsert`` in windows of ``batch_size``
+        (``insert_batch_size`` from the config by default),
+        so Chroma's per-call transaction and HNSW update overhead is amortized.
+
+        Args:
+            file_list: paths of PDF / CSV files to ingest
+            batch_size: number of chunks per ``collection.upsert`` call
+
+        Returns:
+            Summary dict with per-file results and chunk counts per collection
+        """
+        pending = {
+            "pdf": {"ids": [], "documents": [], "metadatas": []},
+            "csv": {"ids": [], "documents": [], "metadatas": []},
+        }
+        files: List[Dict[str, Any]] = []
+        seen_ids = set()
+        # One timestamp for the whole batch instead of a clock read per file
+        upload_time = datetime.now().isoformat()
+        for file_path in file_list:
+            file_path = str(file_path)
+            suffix = Path(file_path).suffix.lower()
+            try:
+                if suffix == ".pdf":
+                    parse_result = _parser().parse_pdf(file_path)
+                    if "error" in parse_result:
+                        files.append({"file_path": file_path, "error": f"Failed to parse PDF: {parse_result['error']}"})
+                        continue
+                    document_id = file_document_id(file_path, "pdf")
+                    doc_metadata = self._pdf_doc_metadata(file_path, parse_result, document_id, upload_time=upload_time)
+                    prepared = self._prepare_chunks(parse_result, doc_metadata, self._chunk_pdf_pages)
+                elif suffix == ".csv":
+                    parse_result = _parser().parse_csv(file_path, include_markdown=False)
+                    if "error" in parse_result:
+                        files.append({"file_path": file_path, "error": f"Failed to parse CSV: {parse_result['error']}"})
+                        continue
+                    document_id = file_document_id(file_path, "csv")
+                    doc_metadata = self._csv_doc_metadata(file_path, parse_result, document_id, upload_time=upload_time)
+                    prepared = self._prepare_chunks(parse_result, doc_metadata, self._chunk_csv_rows)
+                else:
+                    files.append({"file_path": file_path, "error": f"Unsupported file type: {suffix}"})
+                    continue
+            except Exception as e:
+                files.append({"file_path": file_path, "error": f"Error preparing document: {str(e)}"})
+                continue
+
+            ids, documents, metadatas = prepared
+            if document_id in seen_ids:
+                files.append({"file_path": file_path, "error": f"Duplicate content of {document_id}"})
+                continue
+            seen_ids.add(document_id)
+            if not ids:
+                files.append({"file_path": file_path, "error": "No chunks generated"})
+                continue
+
+            bucket = pending[suffix[1:]]
+            bucket["ids"].extend(ids)
+            bucket["documents"].extend(documents)
+            bucket["metadatas"].extend(metadatas)
+            files.append({
+                "file_path": file_path,
+                "document_id": document_id,
+                "file_type": suffix[1:],
+                "chunks": len(ids)
+            })
+
+        collections = {"pdf": self.pdf_collection, "csv": self.csv_collection}
+        added = {"pdf": 0, "csv": 0}
+        writes = {}
+        # One background writer: the PDF upserts run while the CSV chunks are embedded
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="bulk-write") as writer:
+            for file_type, bucket in pending.items():
+                if not bucket["ids"]:
+                    continue
+                try:
+                    # Single embedding pass over every chunk of this type
+                    embeddings = self._embed_texts(bucket["documents"])
+                except Exception as e:
+                    writes[file_type] = e
+                    continue
+                writes[file_type] = writer.submit(
+                    self._add_in_batches, collections[file_type], {**bucket, "embeddings": embeddings}, batch_size
+                )
+
+        for file_type, write in writes.items():
+            try:
+                if isinstance(write, Exception):
+                    raise write
+                write.result()
+                added[file_type] = len(pending[file_type]["ids"])
+            except Exception as e:
+                for info in files:
+                    if info.get("file_type") == file_type and "error" not in info:
+                        info["error"] = f"Error adding {file_type.upper()} chunks: {str(e)}"
+
+        self._update_manifest([
+            (info["file_type"], Path(info["file_path"]).name, info["document_id"], info["chunks"], upload_time)
+            for info in files if "error" not in info
+        ])
+        print(f"✅ Bulk ingestion finished: {added['pdf']} PDF pages, {added['csv']} CSV chunks")
+        return {
+            "status": "success",
+            "files": files,
+            "pdf_chunks_added": added["pdf"],
+            "csv_chunks_added": added["csv"],
+            "failed": sum(1 for info in files if "error" in info)
+        }
+
+    def ingest_many(self,
+                    paths: List[str],
+                    batch_size: int = 200,
+                    max_workers: Optional[int] = None,
+                    use_processes: bool = True) -> Dict[str, Any]:
+        """Ingest many files through a parse -> embed -> write pipeline.
+
+        Files are parsed and chunked in a worker pool; a single embedding thread
+        drains prepared documents in batches of ``batch_size`` chunks and a single
+        writer thread calls ``collection.upsert``. Chroma serializes writers anyway, so
+        one writer is kept while parsing and embedding run ahead of it.
+
+        Args:
+            paths: paths of PDF / CSV files to ingest
+            batch_size: number of chunks per embedding batch and ``collection.upsert`` call
+            max_workers: parser processes; defaults to the number of CPUs minus one so
+                the embedding and writer threads keep a core
+            use_processes: parse in processes (CPU-bound chunking, bypasses the GIL);
+                pass False to parse in threads, which skips process start-up and
+                pickling and suits a handful of small files
+
+        Returns:
+            Summary dict with per-file results and chunk counts per collection
+        """
+        prepared_q: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=8)
+        write_q: "queue.Queue[Optional[Tuple]]" = queue.Queue(maxsize=8)
+        collections = {"pdf": self.pdf_collection, "csv": self.csv_collection}
+        added = {"pdf": 0, "csv": 0}
+        errors: List[str] = []
+
+        def embed_worker():
+            buffers = {
+                file_type: {"ids": [], "documents": [], "metadatas": []}
+                for file_type in collections
+            }
+
+            def flush(file_type, buffer):
+                try:
+                    embeddings = self._embed_texts(buffer["documents"])
+                    write_q.put((file_type, buffer["ids"], buffer["documents"], embeddings, buffer["metadatas"]))
+                except Exception as e:
+                    errors.append(f"Error embedding {file_type.upper()} chunks: {str(e)}")
+                buffers[file_type] = {"ids": [], "documents": [], "metadatas": []}
+
+            try:
+                while True:
+                    item = prepared_q.get()
+                    if item is None:
+                        break
+                    buffer = buffers[item["file_type"]]
+                    ids, documents, metadatas = item["prepared"]
+                    buffer["ids"].extend(ids)
+                    buffer["documents"].extend(documents)
+                    buffer["metadatas"].extend(metadatas)
+                    while len(buffer["ids"]) >= batch_size:
+                        head = {key: values[:batch_size] for key, values in buffer.items()}
+                        tail = {key: values[batch_size:] for key, values in buffer.items()}
+                        flush(item["file_type"], head)
+                        buffers[item["file_type"]] = buffer = tail
+                for file_type, buffer in list(buffers.items()):
+                    if buffer["ids"]:
+                        flush(file_type, buffer)
+            finally:
+                write_q.put(None)
+
+        def write_worker():
+            while True:
+                item = write_q.get()
+                if item is None:
+                    return
+                file_type, ids, documents, embeddings, metadatas = item
+                try:
+                    collections[file_type].upsert(
+                        ids=ids,
+                        documents=documents,
+                        embeddings=embeddings,
+                        metadatas=metadatas
+                    )
+                    added[file_type] += len(ids)
+                except Exception as e:
+                    errors.append(f"Error adding {file_type.upper()} chunks: {str(e)}")
+
+        embed_thread = threading.Thread(target=embed_worker, name="ingest-embed", daemon=True)
+        write_thread = threading.Thread(target=write_worker, name="ingest-write", daemon=True)
+        embed_thread.start()
+        write_thread.start()
+
+        files: List[Dict[str, Any]] = []
+        seen_ids = set()
+        upload_time = datetime.now().isoformat()
+        try:
+            workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+            # Spawn, not fork: the ingest threads are already running and torch may be loaded
+            executor = (
+                ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                if use_processes else ThreadPoolExecutor(max_workers=workers)
+            )
+            with executor:
+                futures = {}
+                for file_path in paths:
+                    file_path = str(file_path)
+                    prefix = Path(file_path).suffix.lower().lstrip(".") or "doc"
+                    try:
+                        document_id = file_document_id(file_path, prefix)
+                    except OSError as e:
+                        files.append({"file_path": file_path, "error": f"Cannot read file: {str(e)}"})
+                        continue
+                    if document_id in seen_ids:
+                        files.append({"file_path": file_path, "error": f"Duplicate content of {document_id}"})
+                        continue
+                    seen_ids.add(document_id)
+                    futures[executor.submit(_parse_and_chunk, file_path, document_id, upload_time)] = file_path
+
+                for future in as_completed(futures):
+                    file_path = futures[future]
+                    try:
+                        item = future.result()
+                    except Exception as e:
+                        item = {"error": f"Error preparing document: {str(e)}"}
+                    if "error" in item:
+                        files.append({"file_path": file_path, "error": item["error"]})
+                        continue
+                    prepared_q.put(item)
+                    files.append({
+                        "file_path": file_path,
+                        "document_id": item["document_id"],
+                        "file_type": item["file_type"],
+                        "chunks": len(item["prepared"][0])
+                    })
+        finally:
+            prepared_q.put(None)
+            embed_thread.join()
+            write_thread.join()
+
+        if errors:
+            # Unknown which files made it in; the next list_documents rebuilds the manifest
+            self._invalidate_manifest()
+        else:
+            self._update_manifest([
+                (info["file_type"], Path(info["file_path"]).name, info["document_id"], info["chunks"], upload_time)
+                for info in files if "error" not in info
+            ])
+        print(f"✅ Pipeline ingestion finished: {added['pdf']} PDF pages, {added['csv']} CSV chunks")
+        return {
+            "status": "success" if not errors else "partial",
+            "files": files,
+            "pdf_chunks_added": added["pdf"],
+            "csv_chunks_added": added["csv"],
+            "failed": sum(1 for info in files if "error" in info),
+            "errors": errors
+        }
+
+    @staticmethod
+    def _pdf_doc_metadata(file_path: str,
+                          parse_result: Dict[str, Any],
+                          document_id: str,
+                          metadata: Optional[Dict[str, Any]] = None,
+                          upload_time: Optional[str] = None) -> Dict[str, Any]:
+        """Build document-level metadata for a parsed PDF."""
+        return {
+            "document_id": document_id,
+            "filename": parse_result.get("filename", "unknown.pdf"),
+            "file_type": "pdf",
+            "file_path": file_path,
+            "upload_time": upload_time or datetime.now().isoformat(),
+            "total_pages": len(parse_result.get("page_chunks", [])),
+            **(metadata or {})
+        }
+
+    @staticmethod
+    def _csv_doc_metadata(file_path: str,
+                          parse_result: Dict[str, Any],
+                          document_id: str,
+                          metadata: Optional[Dict[str, Any]] = None,
+                          upload_time: Optional[str] = None) -> Dict[str, Any]:
+        """Build document-level metadata for a parsed CSV."""
+        return {
+            "document_id": document_id,
+            "filename": parse_result.get("filename", "unknown.csv"),
+            "file_type": "csv",
+            "file_path": file_path,
+            "upload_time": upload_time or datetime.now().isoformat(),
+            "rows": parse_result.get("rows", 0),
+            "columns": parse_result.get("columns", 0),
+            **(metadata or {})
+        }
+
+    def _chunk_pdf_pages(self,
+                         parse_result: Dict[str, Any],
+                         doc_metadata: Dict[str, Any]) -> ChunksBatch:
+        """Turn PyMuPDF4LLM page chunks into page-level chunks."""
+        return self.chunker.chunk_pdf_pages(parse_result.get("page_chunks", []), doc_metadata)
+
+    def _chunk_csv_rows(self,
+                        parse_result: Dict[str, Any],
+                        doc_metadata: Dict[str, Any]) -> ChunksBatch:
+        """Split a parsed CSV into row-level chunks, from the DataFrame when available."""
+        df = parse_result.get("dataframe")
+        if df is not None:
+            return self.chunker.chunk_csv_dataframe(df, doc_metadata)
+        markdown_content = parse_result.get("markdown_content", "")
+        if not markdown_content:
+            return ChunksBatch()
+        return self.chunker.chunk_csv_markdown(markdown_content, doc_metadata)
+
+    @staticmethod
+    def _prepare_chunks(parse_result: Dict[str, Any],
+                        doc_metadata: Dict[str, Any],
+                        chunker_fn: Callable[[Dict[str, Any], Dict[str, Any]], ChunksBatch]
+                        ) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+        """Chunk a parse result into the parallel lists expected by Chroma.
+
+        Returns:
+            (ids, documents, metadatas) where documents are also the strings to
+            embed and metadatas already use the short storage keys
+        """
+        batch = chunker_fn(parse_result, doc_metadata)
+        metadatas = [encode_metadata(meta) for meta in batch.metadatas]
+        return batch.ids, batch.contents, metadatas
     
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get collection statistics."""
         pdf_count = self.pdf_collection.count()
         csv_count = self.csv_collection.count()
         
-        vector_config = self.config["vector_store_config"]
-        
         return {
             "pdf_database": {
-                "path": vector_config["pdf_database"]["persist_directory"],
-                "collection_name": vector_config["pdf_database"]["collection_name"],
+                "path": self._db_path,
+                "collection_name": self.cfg.pdf_database.collection_name,
                 "total_chunks": pdf_count,
                 "description": "PDF documents with page-level chunks"
             },
             "csv_database": {
-                "path": vector_config["csv_database"]["persist_directory"],
-                "collection_name": vector_config["csv_database"]["collection_name"], 
+                "path": self._db_path,
+                "collection_name": self.cfg.csv_database.collection_name, 
                 "total_chunks": csv_count,
                 "description": "CSV documents with row-level chunks"
             },
@@ -253,71 +905,50 @@ class VectorDatabaseManager:
     
     def reset_databases(self):
         """Reset all databases."""
-        vector_config = self.config["vector_store_config"]
-        
         # Reset PDF database
-        self.pdf_client.delete_collection(vector_config["pdf_database"]["collection_name"])
-        self.pdf_collection = self.pdf_client.get_or_create_collection(
-            name=vector_config["pdf_database"]["collection_name"],
-            metadata={"description": "PDF documents with page-level chunks"}
+        self.client.delete_collection(self.cfg.pdf_database.collection_name)
+        self.pdf_collection = self._open_collection(
+            self.cfg.pdf_database.collection_name, "PDF documents with page-level chunks"
         )
         
         # Reset CSV database
-        self.csv_client.delete_collection(vector_config["csv_database"]["collection_name"])
-        self.csv_collection = self.csv_client.get_or_create_collection(
-            name=vector_config["csv_database"]["collection_name"],
-            metadata={"description": "CSV documents with row-level chunks"}
+        self.client.delete_collection(self.cfg.csv_database.collection_name)
+        self.csv_collection = self._open_collection(
+            self.cfg.csv_database.collection_name, "CSV documents with row-level chunks"
         )
         
+        with self._manifest_lock:
+            self._generation += 1
+            if self._manifest_path is not None:
+                self._save_manifest({"pdf": {}, "csv": {}})
+        
         print("🔄 Databases reset successfully")
-        print(f"   📁 PDF Database: {vector_config['pdf_database']['persist_directory']}")
-        print(f"   📁 CSV Database: {vector_config['csv_database']['persist_directory']}")
+        print(f"   📁 Database: {self._db_path}")
         
     def list_documents(self) -> Dict[str, Any]:
         """List existing files in both collections with simple statistics.
 
-        Because Chroma doesn't provide a direct distinct query, we fetch all ids in batches (pagination)
-        and aggregate by filename in metadata. For very large datasets, consider maintaining a persistent index.
+        Because Chroma doesn't provide a direct distinct query, we fetch all metadatas in batches (pagination)
+        and aggregate by filename. Only a running count and the highest page / row number are kept per file.
         """
+        manifest = self._load_manifest()
+        if manifest is not None:
+            result = {
+                "pdf": {fname: {"total_pages": info.get("total_pages")} for fname, info in manifest.get("pdf", {}).items()},
+                "csv": {fname: {"total_rows": info.get("total_rows")} for fname, info in manifest.get("csv", {}).items()},
+            }
+            result["summary"] = {"pdf_files": len(result["pdf"]), "csv_files": len(result["csv"])}
+            return result
+
         result: Dict[str, Any] = {"pdf": {}, "csv": {}}
         try:
-            page_size = 500  # Max items per batch
-
-            # ---- PDF ----
-            pdf_total = self.pdf_collection.count()
-            offset = 0
-            while offset < pdf_total:
-                batch = self.pdf_collection.get(include=["metadatas"], limit=page_size, offset=offset)
-                for meta in batch.get("metadatas", []):
-                    if not meta:
-                        continue
-                    fname = meta.get("filename", "unknown.pdf")
-                    page = meta.get("page_number") or meta.get("page")
-                    info = result["pdf"].setdefault(fname, {"pages": set()})
-                    if page is not None:
-                        info["pages"].add(page)
-                offset += page_size
-            for fname, info in result["pdf"].items():
-                info["total_pages"] = len(info["pages"]) or None
-                info.pop("pages", None)
-
-            # ---- CSV ----
-            csv_total = self.csv_collection.count()
-            offset = 0
-            while offset < csv_total:
-                batch = self.csv_collection.get(include=["metadatas"], limit=page_size, offset=offset)
-                for meta in batch.get("metadatas", []):
-                    if not meta:
-                        continue
-                    fname = meta.get("filename", "unknown.csv")
-                    row = meta.get("row")
-                    info = result["csv"].setdefault(fname, {"rows": set()})
-                    if row is not None:
-                        info["rows"].add(row)
-                offset += page_size
-            for fname, info in result["csv"].items():
-                info["total_rows"] = len(info["rows"]) or None
-                info.pop("rows", None)
+            pdf_stats = self._aggregate_by_filename(self.pdf_collection, "page_number", "unknown.pdf")
+            for fname, (count, max_page) in pdf_stats.items():
+                result["pdf"][fname] = {"total_pages": max_page or count or None}
+
+            csv_stats = self._aggregate_by_filename(self.csv_collection, "row", "unknown.csv")
+            for fname, (count, max_row) in csv_stats.items():
+                result["csv"][fname] = {"total_rows": max_row or count or None}
 
             result["summary"] = {
                 "pdf_files": len(result["pdf"]),
@@ -325,13 +956,172 @@ class VectorDatabaseManager:
             }
         except Exception as e:
             return {"error": f"list_documents failed: {e}"}
+        
+        # Bootstrap the manifest from the scan (document ids / upload times unknown here)
+        if self._manifest_path is not None:
+            with self._manifest_lock:
+                self._save_manifest({
+                    file_type: {fname: dict(info) for fname, info in result[file_type].items()}
+                    for file_type in ("pdf", "csv")
+                })
         return result
 
+    def _load_manifest(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Read the per-file manifest, or None when it is missing / unreadable."""
+        if self._manifest_path is None:
+            return None
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]]) -> None:
+        """Atomically replace the manifest file."""
+        tmp_path = self._manifest_path.with_name(self._manifest_path.name + ".tmp")
+        try:
+            f = open(tmp_path, "w", encoding="utf-8")
+        except FileNotFoundError:
+            # Persist directory removed underneath us; Chroma normally creates it
+            self._manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            f = open(tmp_path, "w", encoding="utf-8")
+        with f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._manifest_path)
+
+    def _invalidate_manifest(self) -> None:
+        """Drop the manifest so the next list_documents falls back to a full scan."""
+        with self._manifest_lock:
+            self._generation += 1
+            if self._manifest_path is None:
+                return
+            try:
+                self._manifest_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _update_manifest(self, entries: List[Tuple[str, str, str, int, str]]) -> None:
+        """Record ingested files as (file_type, filename, document_id, chunks, upload_time).
+
+        Nothing is written while the manifest is missing; list_documents rebuilds
+        it from a scan, which then already includes these files.
+        """
+        if not entries:
+            return
+        with self._manifest_lock:
+            self._generation += 1
+            manifest = self._load_manifest()
+            if manifest is None:
+                return
+            for file_type, filename, document_id, chunks, upload_time in entries:
+                count_key = "total_pages" if file_type == "pdf" else "total_rows"
+                manifest.setdefault(file_type, {})[filename] = {
+                    "document_id": document_id,
+                    count_key: chunks,
+                    "upload_time": upload_time
+                }
+            self._save_manifest(manifest)
+
+    def signature(self) -> str:
+        """Fingerprint of the stored document set; changes whenever documents are added,
+        re-uploaded or deleted."""
+        manifest = self._load_manifest()
+        state = json.dumps(
+            [manifest, self.pdf_collection.count(), self.csv_collection.count()],
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.blake2b(state.encode("utf-8"), digest_size=16).hexdigest()
+
+    def change_token(self) -> Tuple[int, Optional[int]]:
+        """Cheap stand-in for signature() on hot paths (no manifest parse, no Chroma calls).
+
+        Changes on every write through this manager and whenever another manager or
+        process rewrites or drops the manifest.
+        """
+        mtime = None
+        if self._manifest_path is not None:
+            try:
+                mtime = self._manifest_path.stat().st_mtime_ns
+            except OSError:
+                pass
+        return self._generation, mtime
+
+    def manifest_lookup(self, file_type: str, filename: str) -> Tuple[bool, Optional[str]]:
+        """Answer "is this file stored?" from the manifest, without querying Chroma.
+
+        Returns:
+            (known, document_id): known is False when the manifest is missing or the
+            entry came from a scan without document id; otherwise document_id is the
+            stored ID, or None if the file is not in the collection
+        """
+        manifest = self._load_manifest()
+        if manifest is None:
+            return False, None
+        info = manifest.get(file_type, {}).get(filename)
+        if info is None:
+            return True, None
+        document_id = info.get("document_id")
+        return document_id is not None, document_id
+
+    def remove_from_manifest(self, document_id: str) -> None:
+        """Forget a deleted document in the manifest.
+
+        Entries bootstrapped from a scan carry no document id; if none matches,
+        the manifest is dropped and rebuilt by the next list_documents.
+        """
+        with self._manifest_lock:
+            self._generation += 1
+            manifest = self._load_manifest()
+            if manifest is None:
+                return
+            removed = False
+            for files in manifest.values():
+                for filename in [f for f, info in files.items() if info.get("document_id") == document_id]:
+                    del files[filename]
+                    removed = True
+            if removed:
+                self._save_manifest(manifest)
+            else:
+                self._manifest_path.unlink()
+
+    @staticmethod
+    def _aggregate_by_filename(collection,
+                               position_key: str,
+                               default_name: str,
+                               page_size: int = 5000) -> Dict[str, Tuple[int, int]]:
+        """Count chunks and track the highest page / row number per filename.
+
+        Returns:
+            {filename: (chunk_count, max_position)}
+        """
+        counts: Dict[str, int] = defaultdict(int)
+        max_positions: Dict[str, int] = defaultdict(int)
+        total = collection.count()
+        for offset in range(0, total, page_size):
+            batch = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            for meta in batch.get("metadatas") or []:
+                if not meta:
+                    continue
+                meta = decode_metadata(meta)
+                fname = meta.get("filename", default_name)
+                counts[fname] += 1
+                position = meta.get(position_key)
+                if isinstance(position, int) and position > max_positions[fname]:
+                    max_positions[fname] = position
+        return {fname: (count, max_positions[fname]) for fname, count in counts.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def get_db_manager() -> VectorDatabaseManager:
+    """Process-wide database manager, so the UI, the RAG chain and the document manager
+    share one Chroma client, embedding cache connection and query-embedding cache."""
+    return VectorDatabaseManager()
+
 if __name__ == "__main__":
     # Build databases from data folder directly
     print("🚀 Building vector databases from data folder...")
 
-    db_manager = VectorDatabaseManager()
+    db_manager = get_db_manager()
     data_dir = Path("data")
 
     if not data_dir.exists():
@@ -339,29 +1129,21 @@ if __name__ == "__main__":
         print("Please create 'data' folder and put your documents there.")
         exit(1)
 
-    # Process PDF files
-    pdf_files = list(data_dir.glob("*.pdf"))
-    if pdf_files:
-        print(f"📄 Found {len(pdf_files)} PDF files")
-        for file_path in pdf_files:
-            print(f"   Processing: {file_path.name}")
-            result = db_manager.add_pdf_document(str(file_path))
-            if "error" not in result:
-                print(f"   ✅ Added {result['pages_added']} pages")
-            else:
-                print(f"   ❌ Failed: {result['error']}")
-
-    # Process CSV files
-    csv_files = list(data_dir.glob("*.csv"))
-    if csv_files:
-        print(f"📊 Found {len(csv_files)} CSV files")
-        for file_path in csv_files:
-            print(f"   Processing: {file_path.name}")
-            result = db_manager.add_csv_document(str(file_path))
-            if "error" not in result:
-                print(f"   ✅ Added {result['chunks_added']} chunks")
+    # Parse/chunk files in worker processes; embedding and writes stay in this process
+    pdf_files = sorted(data_dir.glob("*.pdf"))
+    csv_files = sorted(data_dir.glob("*.csv"))
+    print(f"📄 Found {len(pdf_files)} PDF files")
+    print(f"📊 Found {len(csv_files)} CSV files")
+    if pdf_files or csv_files:
+        result = db_manager.ingest_many(pdf_files + csv_files)
+        for info in result["files"]:
+            name = Path(info["file_path"]).name
+            if "error" not in info:
+                print(f"   ✅ {name}: {info['chunks']} chunks")
             else:
-                print(f"   ❌ Failed: {result['error']}")
+                print(f"   ❌ {name}: {info['error']}")
+        for error in result["errors"]:
+            print(f"   ❌ {error}")
 
     # Show final statistics
     stats = db_manager.get_collection_stats()
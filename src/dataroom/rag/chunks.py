@@ -1,10 +1,78 @@
 """
-Document chunking utilities for CSV files.
-Handles splitting CSV documents into manageable chunks with metadata.
+Document chunking utilities for PDF and CSV files.
+Handles splitting documents into manageable chunks with metadata.
 """
 
-from typing import List, Dict, Any
-from pathlib import Path
+import re
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterator, Tuple
+
+__all__ = [
+    "ChunksBatch",
+    "DocumentChunker",
+    "META_SCHEMA_VERSION",
+    "META_SHORT",
+    "encode_metadata",
+    "decode_metadata",
+]
+
+# Chroma stores metadata per chunk, so key names are repeated on every row.
+# Chunks are written with these short keys and decoded back on read.
+# Bump META_SCHEMA_VERSION whenever the mapping changes; never reuse a short key.
+META_SCHEMA_VERSION = 1
+META_SHORT = {
+    "document_id": "d",
+    "filename": "f",
+    "file_type": "k",
+    "upload_time": "t",
+    "url": "u",
+    "file_path": "p",
+    "rows": "r",
+    "columns": "c",
+    "page_number": "pn",
+    "row": "ri",
+    "chunk_type": "ct",
+    "total_rows": "tr",
+    "chunk_size": "cs",
+}
+META_LONG = {short: key for key, short in META_SHORT.items()}
+
+# DataFrame rows are stringified this many at a time with column-wise pandas ops
+_ROW_SLICE = 4096
+
+# A whole markdown table line: optional indentation, a leading pipe and at least one more pipe
+_TABLE_ROW_RE = re.compile(r"^[^\S\n]*\|[^\n]*\|[^\n]*", re.MULTILINE)
+
+
+def encode_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Rename metadata keys to their short storage form."""
+    return {META_SHORT.get(k, k): v for k, v in metadata.items()}
+
+
+def decode_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore long metadata keys; rows written with long keys pass through unchanged."""
+    if not metadata:
+        return metadata
+    return {META_LONG.get(k, k): v for k, v in metadata.items()}
+
+
+@dataclass
+class ChunksBatch:
+    """Chunks stored as parallel lists (SoA) that map 1:1 onto Chroma's add() arguments."""
+
+    ids: List[str] = field(default_factory=list)
+    contents: List[str] = field(default_factory=list)
+    metadatas: List[Dict[str, Any]] = field(default_factory=list)
+
+    def append(self, chunk_id: str, content: str, metadata: Dict[str, Any]) -> None:
+        """Append a single chunk."""
+        self.ids.append(chunk_id)
+        self.contents.append(content)
+        self.metadatas.append(metadata)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
 
 class DocumentChunker:
     """Document chunker supporting CSV document segmentation."""
@@ -21,7 +89,7 @@ class DocumentChunker:
     
     def chunk_csv_markdown(self, 
                           markdown_content: str, 
-                          document_metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+                          document_metadata: Dict[str, Any]) -> ChunksBatch:
         """Chunk CSV markdown content.
 
         Args:
@@ -29,9 +97,8 @@ class DocumentChunker:
             document_metadata: document level metadata
 
         Returns:
-            List of chunk metadata dicts
+            ChunksBatch with one chunk per table row
         """
-        chunks = []
         # Split by rows
         chunks = self._split_csv_by_rows(markdown_content, document_metadata)
         print(f"📊 CSV chunking complete: {len(chunks)} chunks")
@@ -39,7 +106,7 @@ class DocumentChunker:
 
     def _split_csv_by_rows(self, 
                           markdown_content: str, 
-                          document_metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+                          document_metadata: Dict[str, Any]) -> ChunksBatch:
         """Split CSV markdown by table rows.
 
         Args:
@@ -47,62 +114,111 @@ class DocumentChunker:
             document_metadata: document metadata
 
         Returns:
-            List of chunk dicts
+            ChunksBatch of row chunks
         """
-        chunks = []
-        lines = markdown_content.split('\n')
-        # Locate table lines
-        table_lines = []
-        header_line = None
+        chunks = ChunksBatch()
+        # Locate table lines in one regex pass over the whole document
+        table_lines = _TABLE_ROW_RE.findall(markdown_content)
         
-        for i, line in enumerate(lines):
-            if line.strip().startswith('|') and '|' in line[1:]:
-                if header_line is None:
-                    header_line = i
-                table_lines.append((i, line))
+        # Fields shared by every row chunk
+        document_id = document_metadata["document_id"]
+        base_metadata = {
+            "document_id": document_id,
+            "file_type": "csv",
+            "filename": document_metadata.get("filename", "unknown.csv"),
+            "chunk_type": "row",
+            "total_rows": len(table_lines) - 1,  # minus header
+        }
+        id_prefix = f"{document_id}_row_"
         
         # Iterate rows as chunks
-        for i, (line_num, line) in enumerate(table_lines):
+        for i, line in enumerate(table_lines):
             if i == 0:  # skip header
                 continue
-            chunk = {
-                "chunk_id": f"{document_metadata['document_id']}_row_{i}",
-                "document_id": document_metadata["document_id"],
-                "content": line.strip(),
-                "metadata": {
-                    "file_type": "csv",
-                    "filename": document_metadata.get("filename", "unknown.csv"),
-                    "row": i,
-                    "chunk_type": "row",
-                    "total_rows": len(table_lines) - 1,  # minus header
-                    "chunk_size": len(line)
-                }
-            }
-            chunks.append(chunk)
+            chunks.append(
+                id_prefix + str(i),
+                line.strip(),
+                {**base_metadata, "row": i, "chunk_size": len(line)}
+            )
             
         return chunks
-    
-    
-    # TODO: PDF chunking functionality - commented out pending page_chunks integration
-    # def chunk_pdf_page_chunks(self, page_chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    #     """
-    #     处理PDF的page_chunks数据，进行二次分块（如果需要）
-    #     
-    #     Args:
-    #         page_chunks: PyMuPDF4LLM返回的page_chunks数据
-    #         
-    #     Returns:
-    #         处理后的分块列表
-    #     """
-    #     chunks = []
-    #     
-    #     for page_chunk in page_chunks:
-    #         # 直接使用页面内容作为chunk，或者进一步分割
-    #         chunk = {
-    #             "chunk_id": f"{page_chunk['metadata']['file_path']}_page_{page_chunk['metadata']['page_number']}",
-    #             "content": page_chunk["text"],
-    #             "metadata": page_chunk["metadata"]
-    #         }
-    #         chunks.append(chunk)
-    #     
-    #     return chunks
+
+    def chunk_csv_dataframe(self,
+                            df,
+                            document_metadata: Dict[str, Any]) -> ChunksBatch:
+        """Chunk a CSV DataFrame into one chunk per row.
+
+        Rows are read straight from the parsed DataFrame, so the markdown table
+        does not have to be split and scanned line by line.
+
+        Args:
+            df: pandas DataFrame returned by the CSV parser
+            document_metadata: document level metadata
+
+        Returns:
+            ChunksBatch with one chunk per data row (rows numbered from 1)
+        """
+        chunks = ChunksBatch()
+        for chunk_id, content, metadata in self.iter_csv_dataframe(df, document_metadata):
+            chunks.append(chunk_id, content, metadata)
+        print(f"📊 CSV chunking complete: {len(chunks)} chunks")
+        return chunks
+
+    def iter_csv_dataframe(self,
+                           df,
+                           document_metadata: Dict[str, Any]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Lazily yield (chunk_id, content, metadata) for each DataFrame row.
+
+        Row text is "column: value | column: value ...", built column-wise with
+        pandas string ops over slices of the frame. Callers can embed and write
+        fixed-size windows without holding every row chunk of a large CSV in memory.
+        """
+        document_id = document_metadata["document_id"]
+        base_metadata = {
+            "document_id": document_id,
+            "file_type": "csv",
+            "filename": document_metadata.get("filename", "unknown.csv"),
+            "chunk_type": "row",
+            "total_rows": len(df),
+        }
+        id_prefix = f"{document_id}_row_"
+        if df.empty or len(df.columns) == 0:
+            return
+        labels = [f"{column}: " for column in df.columns]
+        for start in range(0, len(df), _ROW_SLICE):
+            part = df.iloc[start:start + _ROW_SLICE]
+            columns = [label + part.iloc[:, j].astype(str) for j, label in enumerate(labels)]
+            texts = columns[0].str.cat(columns[1:], sep=" | ") if len(columns) > 1 else columns[0]
+            for i, content in enumerate(texts.tolist(), start=start + 1):
+                yield id_prefix + str(i), content, {**base_metadata, "row": i, "chunk_size": len(content)}
+
+    def chunk_pdf_pages(self,
+                        page_chunks: List[Dict[str, Any]],
+                        document_metadata: Dict[str, Any]) -> ChunksBatch:
+        """Turn PyMuPDF4LLM page chunks into page-level chunks.
+
+        Args:
+            page_chunks: page_chunks returned by PyMuPDF4LLM
+            document_metadata: document level metadata
+
+        Returns:
+            ChunksBatch with one chunk per page
+        """
+        chunks = ChunksBatch()
+        document_id = document_metadata["document_id"]
+        base_metadata = {
+            "document_id": document_id,
+            "filename": document_metadata["filename"],
+            "file_type": "pdf",
+            "chunk_type": "page",
+            "upload_time": document_metadata["upload_time"]
+        }
+        id_prefix = f"{document_id}_page_"
+        for page_chunk in page_chunks:
+            page_number = page_chunk["metadata"]["page"]
+            chunks.append(
+                id_prefix + str(page_number),
+                page_chunk["text"],
+                {**base_metadata, "page_number": page_number}
+            )
+        return chunks
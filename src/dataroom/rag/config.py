@@ -0,0 +1,158 @@
+"""
+Loading of rag_config.yaml and typed views over its vector store section.
+Resolved once at start-up so hot paths use attribute access instead of nested dict lookups.
+"""
+
+import os
+import copy
+import json
+import functools
+import logging
+import yaml
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+# libyaml-backed loader when PyYAML was built with it; same safe semantics
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent / "rag_config.yaml"
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_yaml(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a YAML file; the (mtime, size) key invalidates the entry when the file changes.
+
+    Across processes the parse is cached in a ``<file>.json`` sidecar, which is used
+    as long as it is not older than the YAML file.
+    """
+    sidecar = path + ".json"
+    try:
+        if os.stat(sidecar).st_mtime_ns >= mtime_ns:
+            return json.loads(Path(sidecar).read_bytes())
+    except (OSError, ValueError):
+        pass
+
+    # One read and one decode; the loader handles the UTF-8 bytes itself
+    config = yaml.load(Path(path).read_bytes(), Loader=_YamlLoader)
+
+    # Best effort: the package directory may be read-only
+    try:
+        tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(config, f, ensure_ascii=False)
+        os.replace(tmp_path, sidecar)
+    except (OSError, TypeError, ValueError):
+        pass
+    return config
+
+
+def load_rag_config(config_path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """Load the RAG configuration, parsing the YAML only when the file changed.
+
+    Args:
+        config_path: path of the YAML file; defaults to the bundled rag_config.yaml
+
+    Returns:
+        A deep copy of the parsed config, safe for callers to mutate
+    """
+    path = Path(config_path) if config_path else DEFAULT_CONFIG_PATH
+    stat = path.stat()
+    return copy.deepcopy(_cached_yaml(str(path.resolve()), stat.st_mtime_ns, stat.st_size))
+
+
+@functools.lru_cache(maxsize=8)
+def get_rag_config(config_path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """Process-wide shared RAG configuration.
+
+    Loaded on first use and returned as the same dict afterwards; treat it as
+    read-only. Use ``load_rag_config`` for a private, mutable copy.
+    """
+    return load_rag_config(config_path)
+
+
+def get_log_config(config_path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """The ``log_config`` section of the shared RAG configuration."""
+    return get_rag_config(config_path).get("log_config", {})
+
+
+@functools.lru_cache(maxsize=None)
+def configure_logging(config_path: Optional[Union[str, Path]] = None) -> logging.Logger:
+    """Apply ``log_config`` to the ``dataroom`` package logger once per process.
+
+    ``DATAROOM_LOG_LEVEL`` in the environment overrides the configured level. A console
+    handler is attached only if the application has not configured one.
+    """
+    log_config = get_log_config(config_path)
+    # Top-level package logger ("dataroom"), whatever prefix the package was imported under
+    logger = logging.getLogger(__package__.rsplit(".", 1)[0])
+    logger.setLevel(str(os.getenv("DATAROOM_LOG_LEVEL") or log_config.get("level", "INFO")).upper())
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(log_config.get("format", "%(message)s")))
+        logger.addHandler(handler)
+    return logger
+
+
+@dataclass(frozen=True)
+class CollectionConfig:
+    """Settings of one Chroma collection (pdf_database / csv_database)."""
+
+    __slots__ = ("collection_name", "k")
+
+    collection_name: str
+    k: int
+
+    @classmethod
+    def from_dict(cls, section: Dict[str, Any]) -> "CollectionConfig":
+        return cls(
+            collection_name=section["collection_name"],
+            k=section.get("search_kwargs", {}).get("k", 5)
+        )
+
+
+@dataclass(frozen=True)
+class VectorStoreConfig:
+    """Settings of the persistent vector store and both collections."""
+
+    __slots__ = (
+        "persist_directory",
+        "pdf_database",
+        "csv_database",
+        "hnsw",
+        "embedding_dtype",
+        "embedding_cache_path",
+        "insert_batch_size",
+        "sqlite_build_mode",
+    )
+
+    persist_directory: str
+    pdf_database: CollectionConfig
+    csv_database: CollectionConfig
+    hnsw: Dict[str, Any]
+    embedding_dtype: str
+    embedding_cache_path: str
+    insert_batch_size: int
+    sqlite_build_mode: bool
+
+    @classmethod
+    def from_dict(cls, section: Dict[str, Any]) -> "VectorStoreConfig":
+        return cls(
+            persist_directory=section["persist_directory"],
+            pdf_database=CollectionConfig.from_dict(section["pdf_database"]),
+            csv_database=CollectionConfig.from_dict(section["csv_database"]),
+            hnsw=dict(section.get("hnsw", {})),
+            embedding_dtype=section.get("embedding_dtype", "float16"),
+            embedding_cache_path=section["embedding_cache"]["path"],
+            insert_batch_size=section.get("insert_batch_size", 2000),
+            sqlite_build_mode=section.get("sqlite_build_mode", True)
+        )
+
+
+@functools.lru_cache(maxsize=8)
+def get_vector_store_config(config_path: Optional[Union[str, Path]] = None) -> VectorStoreConfig:
+    """Process-wide typed vector store configuration."""
+    return VectorStoreConfig.from_dict(get_rag_config(config_path)["vector_store_config"])
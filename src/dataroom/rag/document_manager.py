@@ -4,12 +4,22 @@ Handles uploading, updating, and deleting documents in vector databases.
 """
 
 import os
+import logging
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
-from .build_database import VectorDatabaseManager
-from ..tools.parser import parse_pdf, parse_csv
+from .build_database import get_db_manager
+from .chunks import META_SHORT, decode_metadata
+from .config import configure_logging
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+# Shared pool for issuing the PDF and CSV collection lookups concurrently
+_LOOKUP_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="doc-lookup")
 
 class DocumentManager:
     """
@@ -19,8 +29,8 @@ class DocumentManager:
     
     def __init__(self):
         """Initialize the document manager."""
-        self.db_manager = VectorDatabaseManager()
-        print("📚 DocumentManager initialized")
+        self.db_manager = get_db_manager()
+        logger.info("📚 DocumentManager initialized")
     
     def upload_document(self, file_path: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
@@ -51,7 +61,7 @@ class DocumentManager:
     def upload_pdf(self, file_path: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Upload a PDF document."""
         try:
-            print(f"📄 Uploading PDF: {Path(file_path).name}")
+            logger.debug("📄 Uploading PDF: %s", Path(file_path).name)
             
             # Check whether the document already exists
             existing_result = self._check_document_exists(file_path, "pdf")
@@ -62,9 +72,9 @@ class DocumentManager:
             result = self.db_manager.add_pdf_document(file_path, metadata=metadata)
             
             if "error" not in result:
-                print(f"✅ PDF uploaded successfully: {result['pages_added']} pages")
+                logger.debug("✅ PDF uploaded successfully: %s pages", result['pages_added'])
             else:
-                print(f"❌ PDF upload failed: {result['error']}")
+                logger.warning("❌ PDF upload failed: %s", result['error'])
             
             return result
             
@@ -74,7 +84,7 @@ class DocumentManager:
     def upload_csv(self, file_path: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Upload a CSV document."""
         try:
-            print(f"📊 Uploading CSV: {Path(file_path).name}")
+            logger.debug("📊 Uploading CSV: %s", Path(file_path).name)
             
             # Check whether the document already exists
             existing_result = self._check_document_exists(file_path, "csv")
@@ -85,15 +95,63 @@ class DocumentManager:
             result = self.db_manager.add_csv_document(file_path, metadata=metadata)
             
             if "error" not in result:
-                print(f"✅ CSV uploaded successfully: {result['chunks_added']} chunks")
+                logger.debug("✅ CSV uploaded successfully: %s chunks", result['chunks_added'])
             else:
-                print(f"❌ CSV upload failed: {result['error']}")
+                logger.warning("❌ CSV upload failed: %s", result['error'])
             
             return result
             
         except Exception as e:
             return {"error": f"Error uploading CSV: {str(e)}"}
     
+    def bulk_upload(self, file_paths: List[str], use_processes: bool = True) -> Dict[str, Any]:
+        """
+        Upload many documents at once.
+        
+        Files are checked like in ``upload_document`` and the remaining ones go through
+        ``VectorDatabaseManager.ingest_many``: parsing runs in a worker pool, chunks of
+        all files are embedded in shared batches and written with batched upserts
+        instead of one embed + insert round per file.
+        
+        Args:
+            file_paths: Paths to PDF / CSV documents.
+            use_processes: Parse in processes; pass False for a handful of small files.
+        
+        Returns:
+            Ingestion summary; skipped files are listed under "skipped".
+        """
+        try:
+            logger.info("📦 Bulk uploading %s documents", len(file_paths))
+            
+            to_ingest: List[str] = []
+            skipped: List[Dict[str, Any]] = []
+            for file_path in file_paths:
+                path = Path(file_path)
+                file_type = path.suffix.lower().lstrip(".")
+                if not path.exists():
+                    skipped.append({"file_path": str(path), "error": f"File not found: {path}"})
+                elif file_type not in ("pdf", "csv"):
+                    skipped.append({"file_path": str(path), "error": f"Unsupported file type: {path.suffix.lower()}"})
+                else:
+                    existing_result = self._check_document_exists(str(path), file_type)
+                    if existing_result["exists"]:
+                        skipped.append({
+                            "file_path": str(path),
+                            "error": f"Document already exists: {existing_result['document_id']}"
+                        })
+                    else:
+                        to_ingest.append(str(path))
+            
+            if to_ingest:
+                result = self.db_manager.ingest_many(to_ingest, use_processes=use_processes)
+            else:
+                result = {"status": "success", "files": [], "pdf_chunks_added": 0, "csv_chunks_added": 0, "failed": 0, "errors": []}
+            result["skipped"] = skipped
+            return result
+        
+        except Exception as e:
+            return {"error": f"Error bulk uploading documents: {str(e)}"}
+    
     def update_document(self, file_path: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Update a document - delete it first and then re-add.
@@ -106,7 +164,7 @@ class DocumentManager:
             Update result.
         """
         try:
-            print(f"🔄 Updating document: {Path(file_path).name}")
+            logger.debug("🔄 Updating document: %s", Path(file_path).name)
             
             # First delete existing document
             delete_result = self.delete_document_by_path(file_path)
@@ -130,15 +188,15 @@ class DocumentManager:
             Deletion result.
         """
         try:
-            print(f"��️ Deleting document: {document_id}")
+            logger.debug("��️ Deleting document: %s", document_id)
             
-            # Delete from PDF collection
-            pdf_result = self._delete_from_collection(self.db_manager.pdf_collection, document_id)
-            
-            # Delete from CSV collection
-            csv_result = self._delete_from_collection(self.db_manager.csv_collection, document_id)
+            # Delete from the PDF and CSV collections concurrently
+            pdf_future = _LOOKUP_POOL.submit(self._delete_from_collection, self.db_manager.pdf_collection, document_id)
+            csv_future = _LOOKUP_POOL.submit(self._delete_from_collection, self.db_manager.csv_collection, document_id)
+            pdf_result, csv_result = pdf_future.result(), csv_future.result()
             
             if pdf_result["deleted"] or csv_result["deleted"]:
+                self.db_manager.remove_from_manifest(document_id)
                 return {
                     "status": "success",
                     "document_id": document_id,
@@ -163,23 +221,12 @@ class DocumentManager:
         """
         filename = Path(file_path).name
         
-    # Look in PDF collection
-        pdf_docs = self.db_manager.pdf_collection.get(
-            where={"filename": filename},
-            include=['metadatas']
-        )
-        
-    # Look in CSV collection
-        csv_docs = self.db_manager.csv_collection.get(
-            where={"filename": filename},
-            include=['metadatas']
-        )
+    # Look in the PDF and CSV collections concurrently
+        pdf_future = _LOOKUP_POOL.submit(self._find_document_id, "pdf", filename)
+        csv_future = _LOOKUP_POOL.submit(self._find_document_id, "csv", filename)
+        document_id = pdf_future.result() or csv_future.result()
         
-        if pdf_docs['ids']:
-            document_id = pdf_docs['metadatas'][0]['document_id']
-            return self.delete_document(document_id)
-        elif csv_docs['ids']:
-            document_id = csv_docs['metadatas'][0]['document_id']
+        if document_id:
             return self.delete_document(document_id)
         else:
             return {"error": f"Document not found: {filename}"}
@@ -192,48 +239,17 @@ class DocumentManager:
             Document list.
         """
         try:
-            # Retrieve PDF documents
-            pdf_docs = self.db_manager.pdf_collection.get(
-                include=['metadatas']
-            )
-            
-            # Retrieve CSV documents
-            csv_docs = self.db_manager.csv_collection.get(
-                include=['metadatas']
-            )
-            
-            # Process PDF documents
-            pdf_documents = {}
-            for i, metadata in enumerate(pdf_docs['metadatas']):
-                doc_id = metadata['document_id']
-                if doc_id not in pdf_documents:
-                    pdf_documents[doc_id] = {
-                        "document_id": doc_id,
-                        "filename": metadata['filename'],
-                        "file_type": "pdf",
-                        "total_pages": 0,
-                        "upload_time": metadata.get('upload_time', 'unknown')
-                    }
-                pdf_documents[doc_id]["total_pages"] += 1
+            # Retrieve PDF and CSV metadatas concurrently
+            pdf_future = _LOOKUP_POOL.submit(self.db_manager.pdf_collection.get, include=['metadatas'])
+            csv_future = _LOOKUP_POOL.submit(self.db_manager.csv_collection.get, include=['metadatas'])
             
-            # Process CSV documents
-            csv_documents = {}
-            for i, metadata in enumerate(csv_docs['metadatas']):
-                doc_id = metadata['document_id']
-                if doc_id not in csv_documents:
-                    csv_documents[doc_id] = {
-                        "document_id": doc_id,
-                        "filename": metadata['filename'],
-                        "file_type": "csv",
-                        "total_rows": 0,
-                        "upload_time": metadata.get('upload_time', 'unknown')
-                    }
-                csv_documents[doc_id]["total_rows"] += 1
+            pdf_documents = self._group_by_document(pdf_future.result()['metadatas'], "pdf", "total_pages")
+            csv_documents = self._group_by_document(csv_future.result()['metadatas'], "csv", "total_rows")
             
             return {
                 "status": "success",
-                "pdf_documents": list(pdf_documents.values()),
-                "csv_documents": list(csv_documents.values()),
+                "pdf_documents": pdf_documents,
+                "csv_documents": csv_documents,
                 "total_pdf": len(pdf_documents),
                 "total_csv": len(csv_documents),
                 "total_documents": len(pdf_documents) + len(csv_documents)
@@ -242,35 +258,69 @@ class DocumentManager:
         except Exception as e:
             return {"error": f"Error listing documents: {str(e)}"}
     
+    @staticmethod
+    def _group_by_document(metadatas: List[Dict[str, Any]], file_type: str, count_key: str) -> List[Dict[str, Any]]:
+        """Count chunks per document ID and describe each document by its first chunk."""
+        metadatas = [decode_metadata(metadata) for metadata in metadatas]
+        counts = Counter(metadata['document_id'] for metadata in metadatas)
+        first: Dict[str, Dict[str, Any]] = {}
+        for metadata in metadatas:
+            first.setdefault(metadata['document_id'], metadata)
+        
+        return [
+            {
+                "document_id": doc_id,
+                "filename": metadata['filename'],
+                "file_type": file_type,
+                count_key: counts[doc_id],
+                "upload_time": metadata.get('upload_time', 'unknown')
+            }
+            for doc_id, metadata in first.items()
+        ]
+    
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics information."""
         return self.db_manager.get_collection_stats()
     
     def _check_document_exists(self, file_path: str, file_type: str) -> Dict[str, Any]:
         """Check if a document already exists."""
-        filename = Path(file_path).name
-        collection = self.db_manager.pdf_collection if file_type == "pdf" else self.db_manager.csv_collection
+        document_id = self._find_document_id(file_type, Path(file_path).name)
         
-        existing_docs = collection.get(
-            where={"filename": filename},
-            include=['metadatas']
-        )
-        
-        if existing_docs['ids']:
+        if document_id:
             return {
                 "exists": True,
-                "document_id": existing_docs['metadatas'][0]['document_id']
+                "document_id": document_id
             }
         else:
             return {"exists": False}
     
+    def _find_document_id(self, file_type: str, filename: str) -> Optional[str]:
+        """Return the document ID stored for a filename, or None if it is not in the collection."""
+        # The manifest is kept up to date by every write path; only fall back to a
+        # metadata filter when it cannot answer
+        known, document_id = self.db_manager.manifest_lookup(file_type, filename)
+        if known:
+            return document_id
+        
+        collection = self.db_manager.pdf_collection if file_type == "pdf" else self.db_manager.csv_collection
+        # One chunk is enough to read the document ID
+        existing_docs = collection.get(
+            where={META_SHORT["filename"]: filename},
+            limit=1,
+            include=['metadatas']
+        )
+        
+        if not existing_docs['ids']:
+            return None
+        return decode_metadata(existing_docs['metadatas'][0])['document_id']
+    
     def _delete_from_collection(self, collection, document_id: str) -> Dict[str, Any]:
         """Delete document from specified collection."""
         try:
-            # Find all related records
+            # Find all related records (IDs only, no metadata payload)
             docs = collection.get(
-                where={"document_id": document_id},
-                include=['metadatas']
+                where={META_SHORT["document_id"]: document_id},
+                include=[]
             )
             
             if docs['ids']:
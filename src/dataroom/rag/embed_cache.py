@@ -0,0 +1,106 @@
+"""
+Persistent embedding cache keyed by content hash.
+Avoids re-embedding chunks that were already seen (re-ingestion, retries).
+"""
+
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Callable, List, Union
+
+# SQLite caps the number of bound parameters per statement
+_MAX_SQL_VARS = 900
+
+
+class EmbedCache:
+    """SQLite-backed cache mapping blake2b(text) to an embedding vector (float16 by default)."""
+
+    def __init__(self, db_path: str, namespace: str = "", dtype: Union[str, np.dtype] = np.float16):
+        """Open (or create) the cache database.
+
+        Args:
+            db_path: path of the SQLite file holding the cache
+            namespace: mixed into every key (e.g. the embedding model name) so
+                vectors from a different model are never returned
+            dtype: storage dtype; computed vectors are rounded to it before being
+                returned, so a hit and a miss give the same values
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.dtype = np.dtype(dtype)
+        # float16 keys keep the original layout, so existing caches stay valid
+        if self.dtype != np.float16:
+            namespace = f"{namespace}:{self.dtype.name}"
+        self._key_prefix = namespace.encode("utf-8") + b"\0" if namespace else b""
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=normal")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _hash(self, text: str) -> bytes:
+        return hashlib.blake2b(self._key_prefix + text.encode("utf-8"), digest_size=16).digest()
+
+    def get_or_compute(self,
+                       texts: List[str],
+                       embed_fn: Callable[[List[str]], np.ndarray],
+                       dtype: np.dtype = np.float32) -> np.ndarray:
+        """Return embeddings for texts, computing only the ones not cached yet.
+
+        Args:
+            texts: texts to embed
+            embed_fn: batch embedding function used for cache misses
+            dtype: dtype of the returned array
+
+        Returns:
+            Array of shape (N, D) in the same order as texts
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=dtype)
+
+        keys = [self._hash(text) for text in texts]
+        found = {}
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), _MAX_SQL_VARS):
+                window = unique_keys[start:start + _MAX_SQL_VARS]
+                placeholders = ",".join("?" * len(window))
+                rows = self._conn.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE hash IN ({placeholders})", window
+                ).fetchall()
+                for key, vec in rows:
+                    found[key] = np.frombuffer(vec, dtype=self.dtype)
+
+        miss_index = {}
+        for i, key in enumerate(keys):
+            if key not in found and key not in miss_index:
+                miss_index[key] = i
+
+        if miss_index:
+            miss_embeddings = np.asarray(embed_fn([texts[i] for i in miss_index.values()]))
+            rows = []
+            for key, vec in zip(miss_index, miss_embeddings):
+                vec = vec.astype(self.dtype)
+                found[key] = vec
+                rows.append((key, vec.tobytes()))
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (hash, vec) VALUES (?, ?)", rows
+                )
+                self._conn.commit()
+
+        dim = len(next(iter(found.values())))
+        out = np.empty((len(keys), dim), dtype=dtype)
+        for i, key in enumerate(keys):
+            out[i] = found[key]
+        return out
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -4,33 +4,177 @@ Uses CLIP text encoder for text embeddings only.
 """
 
 import os
-import yaml
+import logging
+import functools
 import torch
-from transformers import CLIPProcessor, CLIPModel
-from typing import List, Union, Optional
+import numpy as np
+from typing import List, Union, Optional, Tuple
 from dotenv import load_dotenv
-from pathlib import Path
+
+from .config import get_rag_config, configure_logging
 
 # Load environment variables
 load_dotenv()
 
+configure_logging()
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _model_cache_dirs(cache_dir: str = './model-weights/huggingface') -> Tuple[str, str]:
+    """Create the Hugging Face cache directories once per process."""
+    clip_model_path = os.path.join(cache_dir, 'clip')
+    clip_processor_path = os.path.join(cache_dir, 'clip_processor')
+    os.makedirs(clip_model_path, exist_ok=True)
+    os.makedirs(clip_processor_path, exist_ok=True)
+    return clip_model_path, clip_processor_path
+
+
+def _select_quantized_engine() -> bool:
+    """Pick the int8 kernel backend for this CPU (fbgemm / x86 on x86-64, qnnpack on ARM).
+
+    Returns:
+        False when this PyTorch build has no quantized engine, so the model stays FP32
+    """
+    supported = torch.backends.quantized.supported_engines
+    for engine in ("x86", "fbgemm", "qnnpack"):
+        if engine in supported:
+            if torch.backends.quantized.engine != engine:
+                torch.backends.quantized.engine = engine
+            return True
+    logger.warning("⚠️ No quantized engine available, CLIP stays in FP32 on CPU")
+    return False
+
+
+def _onnx_text_features(model, model_name: str, cache_dir: str):
+    """Export the CLIP text tower to ONNX once and run it with ONNX Runtime on the CPU.
+
+    Returns:
+        Function with the signature of ``get_text_features`` (input_ids, attention_mask),
+        or None when onnxruntime is not installed
+    """
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        logger.warning("⚠️ onnxruntime not installed, falling back to PyTorch on CPU")
+        return None
+    
+    onnx_path = os.path.join(cache_dir, model_name.replace("/", "--") + "-text.onnx")
+    if not os.path.exists(onnx_path):
+        dummy = torch.ones((1, 8), dtype=torch.long)
+        tmp_path = f"{onnx_path}.{os.getpid()}.tmp"
+        torch.onnx.export(
+            model.text_model,
+            (dummy, dummy),
+            tmp_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state", "pooler_output"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+                "pooler_output": {0: "batch"},
+            },
+            opset_version=17
+        )
+        os.replace(tmp_path, onnx_path)
+    
+    session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+    # Projection applied on the host; weights copied out of the module once
+    projection = model.text_projection.weight.detach().numpy().T.copy()
+    
+    def text_features(input_ids, attention_mask, **_):
+        pooled = session.run(
+            ["pooler_output"],
+            {"input_ids": input_ids.numpy(), "attention_mask": attention_mask.numpy()}
+        )[0]
+        return torch.from_numpy(pooled @ projection)
+    
+    return text_features
+
+
+@functools.lru_cache(maxsize=4)
+def _load_clip(model_name: str, device: str, precision: str, compile: bool, accelerator: str = "none"):
+    """Load CLIP once per (model, device, precision, compile, accelerator) and share it across embedders.
+
+    Returns:
+        (model, processor, text feature function, embedding dimension)
+    """
+    from transformers import CLIPProcessor, CLIPModel
+    
+    # Model cache directories (created once per process)
+    clip_model_path, clip_processor_path = _model_cache_dirs()
+    
+    # Load CLIP model & processor; fused scaled-dot-product attention where transformers supports it for CLIP
+    try:
+        model = CLIPModel.from_pretrained(
+            model_name, 
+            cache_dir=clip_model_path,
+            attn_implementation="sdpa"
+        )
+    except (TypeError, ValueError, ImportError):
+        model = CLIPModel.from_pretrained(
+            model_name, 
+            cache_dir=clip_model_path
+        )
+    model = model.to(device)
+    model.eval()
+    model.requires_grad_(False)
+    embedding_dim = model.config.projection_dim
+    
+    # ONNX Runtime graph for the text tower on CPU (full precision; replaces int8 quantization)
+    onnx_features = None
+    if accelerator == "onnx" and device == "cpu":
+        onnx_features = _onnx_text_features(model, model_name, clip_model_path)
+    
+    # Reduced precision: FP16 on CUDA, dynamic int8 Linear layers on CPU
+    if precision == "auto" and onnx_features is None:
+        if str(device).startswith("cuda"):
+            model = model.half()
+        elif device == "cpu" and _select_quantized_engine():
+            # Only the text tower and its projection run here; leave the vision tower alone
+            qconfig = torch.quantization.default_dynamic_qconfig
+            model = torch.quantization.quantize_dynamic(
+                model, {"text_model": qconfig, "text_projection": qconfig}, dtype=torch.qint8
+            )
+    
+    # Optional graph compilation of the text tower (CUDA only; padding lengths vary per batch)
+    text_features = model.get_text_features
+    if compile and str(device).startswith("cuda") and hasattr(torch, "compile"):
+        text_features = torch.compile(model.get_text_features, dynamic=True)
+    if onnx_features is not None:
+        text_features = onnx_features
+    
+    processor = CLIPProcessor.from_pretrained(
+        model_name, 
+        cache_dir=clip_processor_path
+    )
+    
+    logger.info("✅ CLIP model loaded successfully from %s", model_name)
+    return model, processor, text_features, embedding_dim
+
+
 class DocumentEmbedder:
     """Text document embedder using the CLIP text encoder."""
     
-    def __init__(self, model_name: Optional[str] = None, device: Optional[str] = None):
+    def __init__(self,
+                 model_name: Optional[str] = None,
+                 device: Optional[str] = None,
+                 max_batch_size: Optional[int] = None):
         """Initialize CLIP text embedder.
 
         Args:
             model_name: CLIP model name; if None use config file
             device: execution device; if None resolve from config
+            max_batch_size: maximum number of texts per forward pass (bounds VRAM);
+                if None use config file
         """
-    # Load settings from YAML config
-        config_path = Path(__file__).parent / "rag_config.yaml"
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+    # Load settings from YAML config (parsed once per process and shared)
+        config = get_rag_config()
         
         embed_config = config["model_config"]["embedding_model"]
         self.model_name = model_name or embed_config.get("name", "openai/clip-vit-base-patch32")
+        self.max_batch_size = max_batch_size or embed_config.get("max_batch_size", 64)
         
     # Device selection
         if device:
@@ -40,38 +184,71 @@ class DocumentEmbedder:
         else:
             self.device = embed_config.get("device", "cpu")
         
-        print(f"🚀 Initializing CLIP Text Embedder on device: {self.device}")
+        self.precision = embed_config.get("precision", "auto")
+        self.compile = bool(embed_config.get("compile", False))
+        self.accelerator = embed_config.get("accelerator", "none")
         
-    # Model cache directory setup
-        cache_dir = './model-weights/huggingface'
-        clip_model_path = os.path.join(cache_dir, 'clip')
-        clip_processor_path = os.path.join(cache_dir, 'clip_processor')
+    # CLIP weights are loaded on first use (see _ensure_loaded)
+        self._model = None
+        self._processor = None
+        self._text_features = None
+        self._embedding_dim: Optional[int] = None
         
-    # Ensure cache directories exist
-        os.makedirs(clip_model_path, exist_ok=True)
-        os.makedirs(clip_processor_path, exist_ok=True)
-        
-    # Load CLIP model & processor
-        self.model = CLIPModel.from_pretrained(
-            self.model_name, 
-            cache_dir=clip_model_path
-        ).to(self.device)
+    # Tokenizer output of recently seen single texts (repeated chat queries); multi-text
+    # batches are not cached, ingestion never repeats them (see EmbedCache)
+        self._tokenize_single = functools.lru_cache(maxsize=256)(self._tokenize_batch)
         
-        self.processor = CLIPProcessor.from_pretrained(
-            self.model_name, 
-            cache_dir=clip_processor_path
+        logger.info("🚀 CLIP Text Embedder configured for device: %s (weights load on first use)", self.device)
+    
+    def _ensure_loaded(self) -> None:
+        """Load (or reuse) the CLIP model and processor for this configuration."""
+        if self._model is None:
+            self._model, self._processor, self._text_features, self._embedding_dim = _load_clip(
+                self.model_name, self.device, self.precision, self.compile, self.accelerator
+            )
+    
+    def _tokenize_batch(self, texts: Tuple[str, ...]):
+        """Tokenize one mini-batch; the result stays on the CPU so single texts can be cached."""
+        return self.processor(
+            text=list(texts),
+            return_tensors="pt",
+            padding=True,
+            truncation=True
         )
-        
-        print(f"✅ CLIP model loaded successfully from {self.model_name}")
     
-    def embed(self, texts: Union[str, List[str]]) -> Union[List[float], List[List[float]]]:
+    @property
+    def model(self):
+        """CLIP model, loaded on first access."""
+        self._ensure_loaded()
+        return self._model
+    
+    @property
+    def processor(self):
+        """CLIP processor, loaded on first access."""
+        self._ensure_loaded()
+        return self._processor
+    
+    @property
+    def embedding_dim(self) -> int:
+        """Dimension of the text embeddings (CLIP projection size)."""
+        self._ensure_loaded()
+        return self._embedding_dim
+    
+    def embed(self,
+              texts: Union[str, List[str]],
+              dtype: Union[str, np.dtype] = np.float32) -> np.ndarray:
         """Embed one or many texts.
 
+        Texts are tokenized once per forward pass, padded to the longest text in the
+        batch and encoded in batches of at most ``max_batch_size``.
+
         Args:
             texts: single string or list of strings
+            dtype: dtype of the returned array; float16 skips the host-side upcast
+                when the model already runs in FP16
 
         Returns:
-            Single embedding vector or list of vectors
+            Single embedding vector of shape (D,) or an array of shape (N, D)
         """
     # Normalize single input to list
         if isinstance(texts, str):
@@ -81,30 +258,84 @@ class DocumentEmbedder:
             return_single = False
         
         if not texts:
-            return [] if not return_single else []
+            return np.empty((0, 0), dtype=dtype)
         
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype=dtype)
+        self.embed_into(texts, embeddings)
+        
+        # Return single vector if original input was single
+        if return_single:
+            return embeddings[0]
+        else:
+            return embeddings
+    
+    def embed_into(self, texts: List[str], out: np.ndarray) -> np.ndarray:
+        """Embed texts and write the vectors into a preallocated array.
+
+        Each mini-batch is copied to the host straight into its rows of ``out``,
+        so no per-batch tensors or lists are kept around until the end. Texts are
+        grouped by length so a mini-batch is padded to similar-sized neighbours
+        rather than to the longest text of the whole input. Duplicate texts are
+        encoded once and copied to each of their rows.
+
+        Args:
+            texts: list of strings
+            out: array of shape (len(texts), embedding_dim); its dtype is kept
+
+        Returns:
+            ``out``
+        """
+        unique = list(dict.fromkeys(texts))
+        if len(unique) < len(texts):
+            position = {text: i for i, text in enumerate(unique)}
+            unique_out = self.embed_into(unique, np.empty((len(unique), out.shape[1]), dtype=out.dtype))
+            out[:] = unique_out[[position[text] for text in texts]]
+            return out
+        
+        self._ensure_loaded()
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        # On CUDA, copies go through pinned memory without blocking, so the GPU moves on
+        # to the next batch while the previous one is being copied back
+        on_cuda = str(self.device).startswith("cuda")
+        host = None
         try:
-            with torch.no_grad():
-                text_inputs = self.processor(
-                    text=texts, 
-                    return_tensors="pt", 
-                    padding=True, 
-                    truncation=True
-                ).to(self.device)
-                
-                text_emb = self.model.get_text_features(**text_inputs)
-                # Normalize
-                text_emb = text_emb / text_emb.norm(p=2, dim=-1, keepdim=True)
-                
-                # Convert to list
-                embeddings = text_emb.cpu().numpy().tolist()
-                
-                # Return single vector if original input was single
-                if return_single:
-                    return embeddings[0]
-                else:
-                    return embeddings
+            with torch.inference_mode():
+                for start in range(0, len(order), self.max_batch_size):
+                    rows = order[start:start + self.max_batch_size]
+                    batch = tuple(texts[i] for i in rows)
+                    tokens = self._tokenize_single(batch) if len(batch) == 1 else self._tokenize_batch(batch)
+                    # BatchEncoding.to() moves in place, which would leak device tensors into the cache
+                    text_inputs = {
+                        name: (tensor.pin_memory().to(self.device, non_blocking=True) if on_cuda
+                               else tensor.to(self.device))
+                        for name, tensor in tokens.items()
+                    }
+
+                    text_emb = self._text_features(**text_inputs)
+                    # Normalize in place (no second (B, D) buffer on the device)
+                    text_emb.div_(text_emb.norm(p=2, dim=-1, keepdim=True))
+                    if on_cuda:
+                        if host is None:
+                            host = torch.empty(
+                                (len(order), text_emb.shape[1]), dtype=text_emb.dtype, pin_memory=True
+                            )
+                        host[start:start + len(rows)].copy_(text_emb, non_blocking=True)
+                    else:
+                        out[rows] = text_emb.numpy()
+            
+            # Single sync point; host rows are in length order
+            if host is not None:
+                torch.cuda.synchronize(self.device)
+                out[order] = host.numpy()
+            return out
                 
         except Exception as e:
-            print(f"❌ Error embedding texts: {str(e)}")
-            raise
\ No newline at end of file
+            logger.error("❌ Error embedding texts: %s", e)
+            raise
+
+
+@functools.lru_cache(maxsize=None)
+def get_embedder() -> DocumentEmbedder:
+    """Process-wide embedder built from the config, so every database manager shares
+    one tokenizer cache (the CLIP weights are shared by ``_load_clip`` either way)."""
+    return DocumentEmbedder()
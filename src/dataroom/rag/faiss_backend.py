@@ -0,0 +1,188 @@
+"""
+Optional FAISS search backend for the Chroma collections.
+Chroma stays the store of record (documents, metadata, embeddings); nearest-neighbour
+search runs on an in-memory FAISS index built from the stored embeddings.
+"""
+
+import os
+import logging
+import threading
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import configure_logging
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+# Page size for reading stored embeddings out of Chroma when (re)building an index
+_PAGE_SIZE = 5000
+
+
+def vector_backend() -> str:
+    """Search backend selected by ``DATAROOM_VECTOR_BACKEND`` (``chroma`` or ``faiss``)."""
+    return os.getenv("DATAROOM_VECTOR_BACKEND", "chroma").strip().lower()
+
+
+class FaissCollection:
+    """Chroma collection whose ``query`` is answered by a FAISS index.
+
+    Every other attribute is the wrapped collection's. Writes go to Chroma and drop
+    the index, which is rebuilt from the stored embeddings on the next query; so is
+    an index whose collection count or ``change_token`` moved since it was built
+    (writes through another wrapper or process). Queries with a ``where`` /
+    ``where_document`` filter are passed to Chroma.
+    """
+
+    def __init__(self,
+                 collection,
+                 index_spec: str = "HNSW32,Flat",
+                 space: str = "ip",
+                 change_token: Optional[Callable[[], Any]] = None):
+        """Wrap a collection.
+
+        Args:
+            collection: Chroma collection holding the documents and embeddings
+            index_spec: ``faiss.index_factory`` description, e.g. "HNSW32,Flat" or "IVF1024,PQ32"
+            space: distance space of the collection (ip / cosine / l2); distances are
+                returned on the same scale as Chroma's
+            change_token: optional cheap callable whose value changes with the stored
+                document set (e.g. ``VectorDatabaseManager.change_token``)
+        """
+        import faiss
+        self._faiss = faiss
+        self.collection = collection
+        self.index_spec = index_spec
+        self.space = space
+        self.change_token = change_token
+        self._index = None
+        self._ids: List[str] = []
+        self._built_for: Any = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.collection, name)
+
+    def upsert(self, **kwargs) -> None:
+        self.collection.upsert(**kwargs)
+        self._invalidate()
+
+    def add(self, **kwargs) -> None:
+        self.collection.add(**kwargs)
+        self._invalidate()
+
+    def delete(self, **kwargs) -> None:
+        self.collection.delete(**kwargs)
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+            self._ids = []
+
+    def _ensure_index(self):
+        """Build the index from the embeddings stored in Chroma, once per write generation."""
+        with self._lock:
+            total = self.collection.count()
+            state = (total, self.change_token() if self.change_token is not None else None)
+            if self._index is not None and state == self._built_for:
+                return self._index, self._ids
+
+            self._index, self._ids, self._built_for = None, [], state
+            ids: List[str] = []
+            blocks = []
+            for offset in range(0, total, _PAGE_SIZE):
+                page = self.collection.get(include=["embeddings"], limit=_PAGE_SIZE, offset=offset)
+                ids.extend(page["ids"])
+                blocks.append(np.asarray(page["embeddings"], dtype=np.float32))
+            if not ids:
+                return None, []
+
+            vectors = np.ascontiguousarray(np.vstack(blocks))
+            metric = self._faiss.METRIC_L2 if self.space == "l2" else self._faiss.METRIC_INNER_PRODUCT
+            if self.space == "cosine":
+                self._faiss.normalize_L2(vectors)
+            index = self._faiss.index_factory(vectors.shape[1], self.index_spec, metric)
+            if not index.is_trained:
+                index.train(vectors)
+            index.add(vectors)
+
+            self._index, self._ids = index, ids
+            logger.debug("🧭 FAISS index (%s) built over %s vectors", self.index_spec, len(ids))
+            return index, ids
+
+    def query(self,
+              query_embeddings,
+              n_results: int = 10,
+              include: Optional[List[str]] = None,
+              where: Optional[Dict[str, Any]] = None,
+              where_document: Optional[Dict[str, Any]] = None,
+              **kwargs) -> Dict[str, Any]:
+        """Same arguments and result shape as ``Collection.query``."""
+        include = list(include) if include is not None else ["metadatas", "documents", "distances"]
+        if where or where_document or kwargs:
+            return self.collection.query(
+                query_embeddings=query_embeddings, n_results=n_results, include=include,
+                where=where, where_document=where_document, **kwargs
+            )
+
+        queries = np.ascontiguousarray(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        index, ids = self._ensure_index()
+        if index is None:
+            hits = [[] for _ in range(len(queries))]
+            scores = [[] for _ in range(len(queries))]
+        else:
+            if self.space == "cosine":
+                queries = queries.copy()
+                self._faiss.normalize_L2(queries)
+            raw_scores, positions = index.search(queries, min(n_results, len(ids)))
+            hits, scores = [], []
+            for row_scores, row_positions in zip(raw_scores, positions):
+                keep = row_positions >= 0
+                hits.append([ids[p] for p in row_positions[keep]])
+                # Chroma's scale: 1 - dot for ip / cosine, squared L2 for l2
+                row = row_scores[keep]
+                scores.append((row if self.space == "l2" else 1.0 - row).tolist())
+
+        result: Dict[str, Any] = {
+            "ids": hits,
+            "distances": scores if "distances" in include else None,
+            "documents": None,
+            "metadatas": None,
+            "embeddings": None,
+        }
+        payload = [key for key in ("documents", "metadatas", "embeddings") if key in include]
+        if payload:
+            unique_ids = list(dict.fromkeys(hit for row in hits for hit in row))
+            stored = self.collection.get(ids=unique_ids, include=payload) if unique_ids else {"ids": []}
+            position = {doc_id: i for i, doc_id in enumerate(stored["ids"])}
+            # Deleted since the index was built (e.g. by another process): drop the hit
+            for i, row in enumerate(hits):
+                keep = [j for j, hit in enumerate(row) if hit in position]
+                if len(keep) < len(row):
+                    hits[i] = [row[j] for j in keep]
+                    scores[i] = [scores[i][j] for j in keep]
+            result["ids"] = hits
+            if "distances" in include:
+                result["distances"] = scores
+            for key in payload:
+                values = stored.get(key)
+                result[key] = [[values[position[hit]] for hit in row] for row in hits]
+        return result
+
+
+def wrap_collection(collection, change_token: Optional[Callable[[], Any]] = None):
+    """Return the collection behind a FAISS search index when ``DATAROOM_VECTOR_BACKEND=faiss``.
+
+    The index type comes from ``DATAROOM_FAISS_INDEX`` (default "HNSW32,Flat"). Falls
+    back to plain Chroma search when faiss is not installed. ``change_token`` is
+    passed to FaissCollection.
+    """
+    if vector_backend() != "faiss":
+        return collection
+    try:
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        return FaissCollection(collection, os.getenv("DATAROOM_FAISS_INDEX", "HNSW32,Flat"), space, change_token)
+    except ImportError:
+        logger.warning("⚠️ faiss not installed, falling back to Chroma search (pip install .[faiss])")
+        return collection
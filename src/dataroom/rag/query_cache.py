@@ -0,0 +1,95 @@
+"""
+In-memory cache of RAG answers keyed by the normalized query text.
+Near-duplicate queries are matched by cosine similarity of their embeddings.
+"""
+
+import time
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class QueryCache:
+    """Thread-safe LRU cache with per-entry TTL and an optional semantic lookup."""
+
+    def __init__(self,
+                 max_size: int = 2000,
+                 ttl_seconds: float = 600.0,
+                 similarity_threshold: Optional[float] = None,
+                 semantic_window: int = 256):
+        """Create an empty cache.
+
+        Args:
+            max_size: maximum number of cached answers (least recently used are evicted)
+            ttl_seconds: lifetime of an entry; answers go stale as documents change
+            similarity_threshold: minimum cosine similarity for a near-duplicate hit;
+                None (default) disables the semantic lookup. CLIP scores questions that
+                differ only in an entity or number very high, so opt in with care
+            semantic_window: number of most recent query embeddings compared against
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.semantic_window = semantic_window
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.RLock()
+        # Ring buffer of recent unit-norm query embeddings and their keys
+        self._ring: Optional[np.ndarray] = None
+        self._ring_keys = [None] * semantic_window
+        self._ring_pos = 0
+
+    @staticmethod
+    def key(query: str) -> str:
+        """Cache key of a query: case- and surrounding-whitespace-insensitive."""
+        return hashlib.blake2b(query.strip().lower().encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def get_similar(self, embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Return the value cached for the most similar recent query above the threshold."""
+        if self.similarity_threshold is None:
+            return None
+        with self._lock:
+            if self._ring is None:
+                return None
+            scores = self._ring @ (embedding / (np.linalg.norm(embedding) or 1.0))
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold or self._ring_keys[best] is None:
+                return None
+            return self.get(self._ring_keys[best])
+
+    def put(self, key: str, value: Dict[str, Any], embedding: Optional[np.ndarray] = None) -> None:
+        """Store value under key; with an embedding it also becomes a semantic candidate."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+            if embedding is not None and self.similarity_threshold is not None:
+                if self._ring is None:
+                    self._ring = np.zeros((self.semantic_window, embedding.shape[-1]), dtype=np.float32)
+                self._ring[self._ring_pos] = embedding / (np.linalg.norm(embedding) or 1.0)
+                self._ring_keys[self._ring_pos] = key
+                self._ring_pos = (self._ring_pos + 1) % self.semantic_window
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after documents were added or deleted."""
+        with self._lock:
+            self._entries.clear()
+            self._ring = None
+            self._ring_keys = [None] * self.semantic_window
+            self._ring_pos = 0
@@ -3,17 +3,28 @@ RAG Retrieval Chain - Real estate document Q&A system.
 Supports intelligent retrieval and traceability for PDF and CSV documents.
 """
 
+import io
 import os
-import yaml
-from pathlib import Path
-from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+import numpy as np
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from chromadb.config import Settings
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import PromptTemplate
 
-from .embedder import DocumentEmbedder
-from .build_database import VectorDatabaseManager
+from .build_database import get_db_manager
+from .chunks import decode_metadata
+from .config import get_rag_config, configure_logging
+from .query_cache import QueryCache
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+# PDF and CSV searches hit independent collections; HNSW queries release the GIL
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rag-search")
 
 class RealEstateRAGChain:
     """
@@ -28,14 +39,10 @@ class RealEstateRAGChain:
         Args:
             config_path: Path to configuration file.
         """
-        if config_path is None:
-            config_path = str(Path(__file__).parent / "rag_config.yaml")
-
-        print("🚀 Initializing Real Estate RAG Chain...")
+        logger.info("🚀 Initializing Real Estate RAG Chain...")
 
         # Load configuration
-        with open(config_path, "r", encoding="utf-8") as f:
-            self.config = yaml.safe_load(f)
+        self.config = get_rag_config(config_path)
 
         model_config = self.config["model_config"]
         vector_config = self.config["vector_store_config"]
@@ -49,23 +56,51 @@ class RealEstateRAGChain:
             google_api_key=os.getenv("GOOGLE_API_KEY")
         )
 
-        # Initialize embedder
-        self.embedder = DocumentEmbedder()
-
-        # Initialize database manager
-        self.db_manager = VectorDatabaseManager()
+        # Initialize database manager (owns the embedder and the query-embedding cache)
+        self.db_manager = get_db_manager()
+        self.embedder = self.db_manager.embedder
 
         # Retrieval parameters
         self.pdf_k = vector_config["pdf_database"]["search_kwargs"]["k"]
         self.csv_k = vector_config["csv_database"]["search_kwargs"]["k"]
+        self.max_context_chunks = vector_config.get("max_context_chunks")
+        self.max_distance = vector_config.get("max_distance")
+
+        # Answers of recent queries (exact text; near-duplicates only if similarity_threshold is set)
+        cache_config = self.config.get("query_cache", {})
+        self._cache = QueryCache(
+            max_size=cache_config.get("max_size", 2000),
+            ttl_seconds=cache_config.get("ttl_seconds", 600),
+            similarity_threshold=cache_config.get("similarity_threshold")
+        ) if cache_config.get("enabled", True) else None
+        # Document set the cached answers were built from (see _check_cache)
+        self._cache_signature: Optional[Tuple[int, Optional[int]]] = None
 
         # Initialize prompt template (created directly from configuration)
         self.prompt = PromptTemplate(
             template=prompt_config["template"],
             input_variables=prompt_config["input_variables"]
         )
+        # Prompt -> LLM runnable, composed once and reused by every call
+        self._chain = self.prompt | self.llm
+
+        # First-query latency: load the model and page in the indexes now
+        if vector_config.get("warmup", True):
+            self._warm_up()
 
-        print("✅ Real Estate RAG Chain initialized successfully")
+        logger.info("✅ Real Estate RAG Chain initialized successfully")
+    
+    def _warm_up(self) -> None:
+        """Run one throwaway retrieval so the first user query sees steady-state latency."""
+        try:
+            query_embedding = self.embedder.embed(" ")
+            pdf_future = _SEARCH_POOL.submit(self._pdf_retrieval, query_embedding, False)
+            csv_future = _SEARCH_POOL.submit(self._csv_retrieval, query_embedding, False)
+            pdf_future.result()
+            csv_future.result()
+        except Exception as e:
+            # Empty collections or a missing model only cost the first query its warm start
+            logger.debug("⚠️ Warm-up query failed: %s", e)
     
     def invoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -82,145 +117,417 @@ class RealEstateRAGChain:
         if not query:
             raise ValueError("Query must be provided in inputs")
         
-        print(f"🔍 Searching for: {query}")
+        state = self._prepare(query)
+        if "result" in state:
+            return state["result"]
+
+        # Generate answer
+        response = self._chain.invoke({
+            "context": state["context"],
+            "query": query
+        })
+        return self._finish(query, state, response.content)
+    
+    async def ainvoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Asynchronous ``invoke``: retrieval runs in a worker thread (the Chroma client is
+        synchronous) and the LLM call is awaited, so concurrent queries overlap.
+        
+        Args:
+            inputs: Input dictionary containing a "query" key.
+            
+        Returns:
+            Retrieval results and generated answer.
+        """
+        query = inputs.get("query")
+        
+        if not query:
+            raise ValueError("Query must be provided in inputs")
+        
+        state = await asyncio.to_thread(self._prepare, query)
+        if "result" in state:
+            return state["result"]
+        
+        response = await self._chain.ainvoke({
+            "context": state["context"],
+            "query": query
+        })
+        return self._finish(query, state, response.content)
+    
+    def stream(self, inputs: Dict[str, Any]) -> Iterator[str]:
+        """
+        Execute the RAG retrieval pipeline and stream the answer as it is generated.
+        
+        Retrieval is the same as in ``invoke``; only the LLM call is streamed, so the
+        first tokens arrive long before the full completion.
+        
+        Args:
+            inputs: Input dictionary containing a "query" key.
+            
+        Yields:
+            Pieces of the answer text.
+        """
+        query = inputs.get("query")
+        
+        if not query:
+            raise ValueError("Query must be provided in inputs")
+        
+        state = self._prepare(query)
+        if "result" in state:
+            yield state["result"]["answer"]
+            return
+        
+        parts = []
+        for chunk in self._chain.stream({"context": state["context"], "query": query}):
+            if chunk.content:
+                parts.append(chunk.content)
+                yield chunk.content
+        self._finish(query, state, "".join(parts))
+    
+    def _prepare(self, query: str) -> Dict[str, Any]:
+        """Cache lookup, query embedding, retrieval and context building.
+
+        Returns:
+            {"result": ...} when no LLM call is needed (cache hit or no hits),
+            otherwise the retrieval state ``_finish`` needs
+        """
+        logger.debug("🔍 Searching for: %s", query)
+
+        # Repeated query: skip embedding, retrieval and the LLM call
+        signature = self._check_cache()
+        cache_key = QueryCache.key(query)
+        if self._cache is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug("⚡ Answer served from query cache")
+                return {"result": dict(cached)}
+
+        # Generate query embedding (cached for repeated queries)
+        query_embedding = self.db_manager.embed_query(query)
+
+        # Near-duplicate of a recent query
+        if self._cache is not None:
+            cached = self._cache.get_similar(query_embedding)
+            if cached is not None:
+                logger.debug("⚡ Answer served from query cache (similar query)")
+                return {"result": dict(cached)}
 
-        # Generate query embedding
-        query_embedding = self.embedder.embed(query)
+        # Stage 1 + 2: PDF and CSV retrieval run concurrently
+        logger.debug("🔍 Stage 1/2: PDF + CSV retrieval")
+        pdf_future = _SEARCH_POOL.submit(self._pdf_retrieval, query_embedding)
+        csv_future = _SEARCH_POOL.submit(self._csv_retrieval, query_embedding)
+        pdf_results = pdf_future.result()
+        csv_results = csv_future.result()
+
+        if self._off_topic(pdf_results, csv_results):
+            return {"result": self._no_results(pdf_results, csv_results)}
+
+        context, document_count, citations = self._format_documents(pdf_results, csv_results)
+        if not document_count:
+            return {"result": self._no_results(pdf_results, csv_results)}
+
+        logger.debug("Number of context documents: %s, merged context length: %s", document_count, len(context))
+        return {
+            "cache_key": cache_key,
+            "signature": signature,
+            "query_embedding": query_embedding,
+            "pdf_results": pdf_results,
+            "csv_results": csv_results,
+            "document_count": document_count,
+            "citations": citations,
+            "context": context
+        }
+    
+    def _finish(self, query: str, state: Dict[str, Any], answer: str) -> Dict[str, Any]:
+        """Build the result for a generated answer and remember it in the query cache."""
+        # Print debug info before returning
+        self._print_debug_info(query, state["pdf_results"], state["csv_results"], state["document_count"])
 
-        # Stage 1: PDF retrieval
-        print("🔍 Stage 1: PDF retrieval")
-        pdf_results = self._pdf_retrieval(query_embedding)
+        result = {
+            "answer": answer,
+            "context": state["context"],
+            "citations": state["citations"],
+            "pdf_results": state["pdf_results"],
+            "csv_results": state["csv_results"]
+        }
+        # Not if documents changed while this answer was being generated
+        if self._cache is not None and state["signature"] == self._cache_signature:
+            self._cache.put(state["cache_key"], result, state["query_embedding"])
+        return dict(result)
+    
+    def batch_invoke(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Answer several queries at once.
+        
+        Uncached queries are embedded in one forward pass, each collection is queried
+        once with all query vectors, and the LLM calls run through one ``batch`` call.
+        
+        Args:
+            queries: User questions.
+            
+        Returns:
+            One result dict per query, in order (same shape as ``invoke``).
+        """
+        if not all(queries):
+            raise ValueError("Every query must be a non-empty string")
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        signature = self._check_cache()
+        cache_keys = [QueryCache.key(query) for query in queries]
+        pending = []
+        for i, cache_key in enumerate(cache_keys):
+            cached = self._cache.get(cache_key) if self._cache is not None else None
+            if cached is not None:
+                results[i] = dict(cached)
+            else:
+                pending.append(i)
+        if not pending:
+            return results
+        
+        logger.debug("🔍 Batch search for %s queries", len(pending))
+        query_embeddings = np.asarray(self.embedder.embed([queries[i] for i in pending]), dtype=np.float32)
+        
+        # One multi-query call per collection, both collections concurrently
+        pdf_future = _SEARCH_POOL.submit(self._search, self.db_manager.pdf_collection, query_embeddings, self.pdf_k)
+        csv_future = _SEARCH_POOL.submit(self._search, self.db_manager.csv_collection, query_embeddings, self.csv_k)
+        pdf_batch = pdf_future.result()
+        csv_batch = csv_future.result()
+        
+        to_generate = []
+        for j, i in enumerate(pending):
+            pdf_results = self._split_results(pdf_batch, j)
+            csv_results = self._split_results(csv_batch, j)
+            if self._off_topic(pdf_results, csv_results):
+                results[i] = self._no_results(pdf_results, csv_results)
+                continue
+            context, document_count, citations = self._format_documents(pdf_results, csv_results)
+            if not document_count:
+                results[i] = self._no_results(pdf_results, csv_results)
+                continue
+            to_generate.append((i, j, context, citations, pdf_results, csv_results))
+        
+        if to_generate:
+            responses = self._chain.batch([
+                {"context": context, "query": queries[i]}
+                for i, _, context, _, _, _ in to_generate
+            ])
+            for (i, j, context, citations, pdf_results, csv_results), response in zip(to_generate, responses):
+                result = {
+                    "answer": response.content,
+                    "context": context,
+                    "citations": citations,
+                    "pdf_results": pdf_results,
+                    "csv_results": csv_results
+                }
+                if self._cache is not None and signature == self._cache_signature:
+                    self._cache.put(cache_keys[i], result, query_embeddings[j])
+                results[i] = dict(result)
+        
+        logger.debug("✅ Answered %s queries (%s from cache)", len(queries), len(queries) - len(pending))
+        return results
+    
+    def _format_documents(self,
+                          pdf_results: Dict[str, Any],
+                          csv_results: Dict[str, Any]) -> Tuple[str, int, List[Dict[str, Any]]]:
+        """Merge PDF and CSV hits into one context, each entry prefixed with its source.
 
-        # Stage 2: CSV retrieval
-        print("🔍 Stage 2: CSV retrieval")
-        csv_results = self._csv_retrieval(query_embedding)
+        The same pass collects one citation per context entry, so callers don't walk the
+        metadatas again. With ``max_context_chunks`` set, only the hits closest to the
+        query across both collections are kept in the context (in their original order),
+        which shortens the prompt. Chunk texts are written straight into the context
+        buffer instead of being copied into a formatted entry first.
 
-        # Merge retrieval results
-        all_documents = []
-        all_metadatas = []
+        Returns:
+            (context, number of context entries, citations)
+        """
+        # (header, chunk text, citation) per hit
+        entries = []
+        distances = []
 
         # Process PDF results
         if pdf_results['documents'] and pdf_results['documents'][0]:
-            for doc, metadata in zip(
+            for doc, metadata, distance in zip(
                 pdf_results['documents'][0],
-                pdf_results['metadatas'][0]
+                pdf_results['metadatas'][0],
+                self._distances(pdf_results)
             ):
                 filename = metadata.get("filename", "unknown.pdf")
                 page_number = metadata.get("page_number", "unknown")
-                formatted_doc = f"Document: {filename}, Page {page_number}\n{doc}"
-                all_documents.append(formatted_doc)
-                all_metadatas.append(metadata)
+                entries.append((
+                    f"Document: {filename}, Page {page_number}\n", doc,
+                    {"type": "pdf", "filename": filename, "page_number": page_number}
+                ))
+                distances.append(distance)
 
         # Process CSV results
         if csv_results['documents'] and csv_results['documents'][0]:
-            for doc, metadata in zip(
+            for doc, metadata, distance in zip(
                 csv_results['documents'][0],
-                csv_results['metadatas'][0]
+                csv_results['metadatas'][0],
+                self._distances(csv_results)
             ):
                 filename = metadata.get("filename", "unknown.csv")
                 row = metadata.get("row", "unknown")
-                formatted_doc = f"Data: {filename}, Row {row}\n{doc}"
-                all_documents.append(formatted_doc)
-                all_metadatas.append(metadata)
-
-        if not all_documents:
-            return {
-                "answer": "Sorry, no relevant document content was found to answer your question.",
-                "context": "",
-                "pdf_results": pdf_results,
-                "csv_results": csv_results
-            }
+                entries.append((
+                    f"Data: {filename}, Row {row}\n", doc,
+                    {"type": "csv", "filename": filename, "row": row}
+                ))
+                distances.append(distance)
 
-        # Build context
-        context = "\n\n---\n\n".join(all_documents)
-
-        print(f"Number of context documents: {len(all_documents)}")
-        print(f"Merged context length: {len(context)}")
+        # Keep the closest hits (and only their citations); both collections share the same distance space
+        top_m = self.max_context_chunks
+        if top_m and len(entries) > top_m:
+            keep = np.sort(np.argpartition(np.asarray(distances, dtype=np.float32), top_m - 1)[:top_m])
+            entries = [entries[i] for i in keep]
 
-        # Generate answer
-        chain = self.prompt | self.llm
-        response = chain.invoke({
-            "context": context,
-            "query": query
-        })
-
-        # Print debug info before returning
-        self._print_debug_info(query, pdf_results, csv_results, all_documents)
+        # Build context
+        buffer = io.StringIO()
+        for i, (header, doc, _) in enumerate(entries):
+            if i:
+                buffer.write("\n\n---\n\n")
+            buffer.write(header)
+            buffer.write(doc)
 
+        return buffer.getvalue(), len(entries), [citation for _, _, citation in entries]
+    
+    def _off_topic(self, pdf_results: Dict[str, Any], csv_results: Dict[str, Any]) -> bool:
+        """True if even the closest hit is farther than ``max_distance`` (no LLM call needed)."""
+        if self.max_distance is None:
+            return False
+        best = min(
+            (distance for results in (pdf_results, csv_results)
+             for distance in (results.get('distances') or [[]])[0]),
+            default=float("inf")
+        )
+        if best > self.max_distance:
+            logger.debug("🚫 Closest hit at distance %.4f exceeds max_distance %.4f, skipping LLM call",
+                         best, self.max_distance)
+            return True
+        return False
+    
+    @staticmethod
+    def _distances(results: Dict[str, Any]) -> List[float]:
+        """Distances of the first query's hits, or +inf placeholders if they were not requested."""
+        if results.get('distances'):
+            return results['distances'][0]
+        return [float("inf")] * len(results['documents'][0])
+    
+    @staticmethod
+    def _no_results(pdf_results: Dict[str, Any], csv_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Result returned when neither collection had a hit."""
         return {
-            "answer": response.content,
-            "context": context,
+            "answer": "Sorry, no relevant document content was found to answer your question.",
+            "context": "",
+            "citations": [],
             "pdf_results": pdf_results,
             "csv_results": csv_results
         }
     
-    def _pdf_retrieval(self, query_embedding: List[float]) -> Dict[str, Any]:
-        """Retrieve PDF documents."""
-        return self.db_manager.pdf_collection.query(
-            query_embeddings=[query_embedding],
-            n_results=self.pdf_k,
-            include=['documents', 'metadatas', 'distances']
+    @staticmethod
+    def _split_results(results: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """Results of one query out of a multi-query ``collection.query`` response."""
+        return {
+            key: [results[key][index]] if results.get(key) is not None else None
+            for key in ("ids", "documents", "metadatas", "distances")
+        }
+    
+    def clear_cache(self) -> None:
+        """Forget cached answers (also done automatically when the document set changes)."""
+        if self._cache is not None:
+            self._cache.clear()
+    
+    def _check_cache(self) -> Optional[Tuple[int, Optional[int]]]:
+        """Drop cached answers if documents were added, re-uploaded or deleted since they
+        were cached, by any manager or process sharing the store.
+
+        Uses the manager's change token (a counter plus the manifest mtime) rather than
+        the full signature, so a lookup costs one stat() instead of Chroma calls.
+
+        Returns:
+            The current change token, or None when the cache is disabled
+        """
+        if self._cache is None:
+            return None
+        signature = self.db_manager.change_token()
+        if signature != self._cache_signature:
+            self._cache.clear()
+            self._cache_signature = signature
+        return signature
+    
+    def _search(self,
+                collection,
+                query_embedding: np.ndarray,
+                n_results: int,
+                include_documents: bool = True) -> Dict[str, Any]:
+        """Query a collection with one or more precomputed query embeddings.
+
+        Args:
+            collection: Chroma collection to query
+            query_embedding: query vector (D,) or a batch of query vectors (N, D)
+            n_results: number of hits
+            include_documents: fetch chunk text; ranking-only callers pass False to
+                skip reading document payloads from SQLite
+        """
+        include = ['metadatas', 'distances']
+        if include_documents:
+            include.insert(0, 'documents')
+        results = collection.query(
+            query_embeddings=np.atleast_2d(query_embedding),
+            n_results=n_results,
+            include=include
         )
+        results['metadatas'] = [
+            [decode_metadata(meta) for meta in metadatas]
+            for metadatas in results.get('metadatas') or []
+        ]
+        return results
     
-    def _csv_retrieval(self, query_embedding: List[float]) -> Dict[str, Any]:
+    def _pdf_retrieval(self, query_embedding: np.ndarray, include_documents: bool = True) -> Dict[str, Any]:
+        """Retrieve PDF documents."""
+        return self._search(self.db_manager.pdf_collection, query_embedding, self.pdf_k, include_documents)
+    
+    def _csv_retrieval(self, query_embedding: np.ndarray, include_documents: bool = True) -> Dict[str, Any]:
         """Retrieve CSV documents."""
-        return self.db_manager.csv_collection.query(
-            query_embeddings=[query_embedding],
-            n_results=self.csv_k,
-            include=['documents', 'metadatas', 'distances']
-        )
+        return self._search(self.db_manager.csv_collection, query_embedding, self.csv_k, include_documents)
     
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics."""
         return self.db_manager.get_collection_stats()
 
-    def _print_debug_info(self, query, pdf_results, csv_results, all_documents):
-        """Display debug information for the RAG retrieval."""
-        print(f"\n{'='*60}")
-        print(f" RAG Retrieval Debug Info")
-        print(f"{'='*60}")
+    def _print_debug_info(self, query, pdf_results, csv_results, document_count):
+        """Log debug information for the RAG retrieval (skipped unless DEBUG is enabled)."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+
+        lines = [f"\n{'='*60}", " RAG Retrieval Debug Info", f"{'='*60}"]
 
         # Query information
-        print(f" Query: '{query}'")
+        lines.append(f" Query: '{query}'")
 
-        # PDF retrieval results
-        print(f"\n--- PDF Retrieval Results ---")
-        if pdf_results['documents'] and pdf_results['documents'][0]:
-            for i, (doc, metadata, distance) in enumerate(zip(
-                pdf_results['documents'][0],
-                pdf_results['metadatas'][0],
-                pdf_results['distances'][0]
-            )):
-                similarity = 1.0 / (1.0 + distance) if distance > 0 else 1.0
-                print(f"📄 PDF {i+1}:")
-                print(f"    📏 Distance: {distance:.4f}")
-                print(f"    Similarity: {similarity:.4f} ({similarity*100:.1f}%)")
-                print(f"    File: {metadata.get('filename', 'unknown')}")
-                print(f"    Page: {metadata.get('page_number', 'unknown')}")
-                print(f"     Content preview: {doc[:100]}...")
-                print()
-        else:
-            print("❌ No PDF results found")
-
-        # CSV retrieval results
-        print(f"\n--- CSV Retrieval Results ---")
-        if csv_results['documents'] and csv_results['documents'][0]:
-            for i, (doc, metadata, distance) in enumerate(zip(
-                csv_results['documents'][0],
-                csv_results['metadatas'][0],
-                csv_results['distances'][0]
-            )):
-                similarity = 1.0 / (1.0 + distance) if distance > 0 else 1.0
-                print(f"📊 CSV {i+1}:")
-                print(f"    📏 Distance: {distance:.4f}")
-                print(f"    Similarity: {similarity:.4f} ({similarity*100:.1f}%)")
-                print(f"    File: {metadata.get('filename', 'unknown')}")
-                print(f"    Row: {metadata.get('row', 'unknown')}")
-                print(f"     Content preview: {doc[:100]}...")
-                print()
-        else:
-            print("❌ No CSV results found")
-
-        print(f"📚 Total retrieved documents: {len(all_documents)}")
-        print(f"{'='*60}\n")
+        for label, icon, results, position_key, position_label in (
+            ("PDF", "📄", pdf_results, "page_number", "Page"),
+            ("CSV", "📊", csv_results, "row", "Row"),
+        ):
+            lines.append(f"\n--- {label} Retrieval Results ---")
+            if results['documents'] and results['documents'][0]:
+                for i, (doc, metadata, distance) in enumerate(zip(
+                    results['documents'][0],
+                    results['metadatas'][0],
+                    results['distances'][0]
+                )):
+                    similarity = 1.0 / (1.0 + distance) if distance > 0 else 1.0
+                    lines.extend([
+                        f"{icon} {label} {i+1}:",
+                        f"    📏 Distance: {distance:.4f}",
+                        f"    Similarity: {similarity:.4f} ({similarity*100:.1f}%)",
+                        f"    File: {metadata.get('filename', 'unknown')}",
+                        f"    {position_label}: {metadata.get(position_key, 'unknown')}",
+                        f"     Content preview: {doc[:100]}...",
+                        "",
+                    ])
+            else:
+                lines.append(f"❌ No {label} results found")
 
+        lines.append(f"📚 Total retrieved documents: {document_count}")
+        lines.append(f"{'='*60}\n")
+        logger.debug("\n".join(lines))
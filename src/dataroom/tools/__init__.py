@@ -1,7 +1,16 @@
 """Tools module for agent functionality."""
 
-from .parser import parse_pdf, parse_csv
-from .rag_tool import RealEstateRAGTool, RealEstateRAGInput
+import importlib
+
+# Submodules are imported on first attribute access (PEP 562): the parser pulls in
+# pandas / PyMuPDF4LLM and the RAG tool the whole LangChain + Chroma stack, and
+# importing one should not load the other.
+_LAZY = {
+    "parse_pdf": ".parser",
+    "parse_csv": ".parser",
+    "RealEstateRAGTool": ".rag_tool",
+    "RealEstateRAGInput": ".rag_tool",
+}
 
 __all__ = [
     "parse_pdf",
@@ -9,3 +18,11 @@ __all__ = [
     "RealEstateRAGTool",
     "RealEstateRAGInput"
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
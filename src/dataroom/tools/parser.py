@@ -1,14 +1,72 @@
+import os
+import threading
+import multiprocessing
+import pymupdf
 import pymupdf4llm
 import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
-def parse_pdf(file_path: str) -> Dict[str, Any]:
+# Parsed PDFs keyed by (path, mtime_ns, size); re-parsing is the slowest step of ingestion
+_PDF_CACHE_SIZE = 8
+_PDF_CACHE: "OrderedDict[Tuple[str, int, int], Dict[str, Any]]" = OrderedDict()
+_PDF_CACHE_LOCK = threading.Lock()
+
+# Below this many pages per worker, process start-up costs more than it saves
+_PAGES_PER_WORKER = 16
+
+# Page-range workers, created on first use and kept for the life of the process
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+def _pdf_pool() -> ProcessPoolExecutor:
+    """Shared parse pool. Workers are spawned, not forked: callers are threads of a
+    process that already runs torch and Chroma threads, and a forked child could
+    inherit one of their locks held."""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=min(8, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _PDF_POOL
+
+def _pdf_pages_to_markdown(file_path: str, pages: List[int], hdr_info: Any) -> List[Dict[str, Any]]:
+    """Page chunks of a page range; module-level so it can run in a worker process."""
+    return pymupdf4llm.to_markdown(file_path, pages=pages, hdr_info=hdr_info, page_chunks=True)
+
+def _parallel_page_chunks(file_path: str, max_workers: int) -> List[Dict[str, Any]]:
+    """Parse a large PDF in contiguous page ranges across processes, in page order.
+
+    MuPDF is not thread-safe, so pages are split across processes (one open document
+    each) rather than threads. Small documents are parsed inline.
+
+    Header levels come from font sizes; they are identified once over the whole
+    document and shared by all ranges, so "#" / "##" match a single-pass parse.
+    """
+    with pymupdf.open(file_path) as doc:
+        page_count = doc.page_count
+    workers = min(max_workers, page_count // _PAGES_PER_WORKER)
+    if workers <= 1:
+        return pymupdf4llm.to_markdown(file_path, page_chunks=True)
+
+    step = -(-page_count // workers)
+    ranges = [list(range(start, min(start + step, page_count))) for start in range(0, page_count, step)]
+    hdr_info = pymupdf4llm.IdentifyHeaders(file_path)
+    parts = _pdf_pool().map(_pdf_pages_to_markdown, [file_path] * len(ranges), ranges, [hdr_info] * len(ranges))
+    return [chunk for part in parts for chunk in part]
+
+def parse_pdf(file_path: str, max_workers: Optional[int] = None) -> Dict[str, Any]:
     """
     Parse a local PDF file using PyMuPDF4LLM and return page-level chunks.
     
     Args:
         file_path: Local PDF file path
+        max_workers: Processes used for large PDFs (default: up to 8 CPUs); pass 1
+            when already running inside a worker process
         
     Returns:
         Dictionary containing page parsing results
@@ -24,12 +82,27 @@ def parse_pdf(file_path: str) -> Dict[str, Any]:
         if file_path.suffix.lower() != '.pdf':
             return {"error": f"Not a PDF file: {file_path}"}
 
+        # Unchanged file parsed before in this process
+        stat = file_path.stat()
+        cache_key = (str(file_path.resolve()), stat.st_mtime_ns, stat.st_size)
+        with _PDF_CACHE_LOCK:
+            cached = _PDF_CACHE.get(cache_key)
+            if cached is not None:
+                _PDF_CACHE.move_to_end(cache_key)
+                print(f"⚡ PDF parse reused from cache: {file_path.name}")
+                return dict(cached)
+
         # Use PyMuPDF4LLM with page_chunks enabled
         print(f"🔍 Parsing PDF with PyMuPDF4LLM: {file_path.name}")
-        page_chunks = pymupdf4llm.to_markdown(
-            str(file_path),
-            page_chunks=True
-        )
+        if max_workers is None:
+            max_workers = min(8, os.cpu_count() or 1)
+        if max_workers > 1:
+            page_chunks = _parallel_page_chunks(str(file_path), max_workers)
+        else:
+            page_chunks = pymupdf4llm.to_markdown(
+                str(file_path),
+                page_chunks=True
+            )
 
         result = {
             "status": "success",
@@ -47,17 +120,95 @@ def parse_pdf(file_path: str) -> Dict[str, Any]:
             print(f" Page structure keys: {list(first_page.keys())}")
             print(f"📄 First page metadata keys: {list(first_page.get('metadata', {}).keys())}")
 
-        return result
+        with _PDF_CACHE_LOCK:
+            _PDF_CACHE[cache_key] = result
+            while len(_PDF_CACHE) > _PDF_CACHE_SIZE:
+                _PDF_CACHE.popitem(last=False)
+
+        return dict(result)
 
     except Exception as e:
         return {"error": f"PDF parsing failed: {str(e)}"}
 
-def parse_csv(file_path: str) -> Dict[str, Any]:
+def _dataframe_to_markdown(df: pd.DataFrame) -> str:
+    """Markdown pipe table built column-wise instead of formatting cell by cell."""
+    header = "| " + " | ".join(str(column) for column in df.columns) + " |"
+    separator = "|" + "|".join("---" for _ in df.columns) + "|"
+    if df.empty:
+        return f"{header}\n{separator}"
+    cells = df.astype(str)
+    rows = "| " + cells.iloc[:, 0]
+    for j in range(1, cells.shape[1]):
+        rows = rows + " | " + cells.iloc[:, j]
+    rows = rows + " |"
+    return "\n".join([header, separator, *rows.tolist()])
+
+class _LazyCSVInfo(dict):
+    """CSV parse result whose per-column statistics are computed on first access.
+
+    ``describe()`` and the boxed sample rows cost extra passes over the data, and
+    ingestion never reads them. Anything that walks the whole mapping (keys, items,
+    ``dict()``, ``json.dumps``, ``==``) computes them first, so it behaves like the
+    plain dict it replaces.
+    """
+
+    _LAZY_KEYS = ("data_types", "sample_data", "summary_stats")
+
+    def __missing__(self, key):
+        if key not in self._LAZY_KEYS:
+            raise KeyError(key)
+        df = dict.__getitem__(self, "dataframe")
+        if key == "data_types":
+            value = df.dtypes.to_dict()
+        elif key == "sample_data":
+            value = df.head(5).to_dict('records')
+        else:
+            value = df.describe().to_dict() if len(df.select_dtypes(include=['number']).columns) > 0 else {}
+        self[key] = value
+        return value
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._LAZY_KEYS
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def _fill(self) -> "_LazyCSVInfo":
+        for key in self._LAZY_KEYS:
+            if not dict.__contains__(self, key):
+                self.__missing__(key)
+        return self
+
+    def __iter__(self):
+        return dict.__iter__(self._fill())
+
+    def __len__(self):
+        return dict.__len__(self._fill())
+
+    def __eq__(self, other):
+        return dict.__eq__(self._fill(), other)
+
+    __hash__ = None
+
+    def keys(self):
+        return dict.keys(self._fill())
+
+    def items(self):
+        return dict.items(self._fill())
+
+    def values(self):
+        return dict.values(self._fill())
+
+    def copy(self):
+        return dict(self.items())
+
+def parse_csv(file_path: str, include_markdown: bool = True) -> Dict[str, Any]:
     """
     Parse CSV document using pandas and convert to Markdown format.
     
     Args:
         file_path: Path to the CSV file
+        include_markdown: Build the Markdown rendering of the whole table
         
     Returns:
         Dictionary containing parsed content and metadata in Markdown format
@@ -72,29 +223,34 @@ def parse_csv(file_path: str) -> Dict[str, Any]:
             return {"error": f"Not a CSV file: {file_path}"}
 
         # Read CSV with pandas
+        # C engine on purpose: pyarrow infers timestamps / types differently, which
+        # would change the row text (and embeddings) of existing data
         df = pd.read_csv(file_path)
 
         # Convert to Markdown
-        markdown_content = f"# {file_path.name}\n\n"
-        markdown_content += f"**Rows**: {len(df)}\n"
-        markdown_content += f"**Columns**: {len(df.columns)}\n\n"
-        markdown_content += "## Full Data\n\n"
-        markdown_content += df.to_markdown(index=False)
+        markdown_content = ""
+        if include_markdown:
+            markdown_content = "".join([
+                f"# {file_path.name}\n\n",
+                f"**Rows**: {len(df)}\n",
+                f"**Columns**: {len(df.columns)}\n\n",
+                "## Full Data\n\n",
+                _dataframe_to_markdown(df)
+            ])
 
-        info = {
+        # data_types / sample_data / summary_stats are filled in on first access
+        info = _LazyCSVInfo({
             "filename": file_path.name,
             "file_type": "csv",
             "status": "success",
             "rows": len(df),
             "columns": len(df.columns),
             "column_names": list(df.columns),
-            "data_types": df.dtypes.to_dict(),
-            "sample_data": df.head(5).to_dict('records'),
-            "summary_stats": df.describe().to_dict() if len(df.select_dtypes(include=['number']).columns) > 0 else {},
             "markdown_content": markdown_content,
+            "dataframe": df,  # lets the chunker build row chunks without re-parsing the markdown
             "output_format": "Markdown",
             "file_path": str(file_path)
-        }
+        })
 
         return info
 
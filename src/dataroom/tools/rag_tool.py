@@ -7,12 +7,27 @@ from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 from typing import Type, Optional, Any
 import sys
+import threading
 from pathlib import Path
 
 # Use relative import; no need to modify sys.path
 
 from ..rag.rag_chain import RealEstateRAGChain
 
+# One RAG chain (LLM client, embedder, Chroma client) shared by every tool instance
+_SHARED_CHAIN: Optional[RealEstateRAGChain] = None
+_SHARED_CHAIN_LOCK = threading.Lock()
+
+
+def _get_chain() -> RealEstateRAGChain:
+    """Return the process-wide RAG chain, building it on first use."""
+    global _SHARED_CHAIN
+    if _SHARED_CHAIN is None:
+        with _SHARED_CHAIN_LOCK:
+            if _SHARED_CHAIN is None:
+                _SHARED_CHAIN = RealEstateRAGChain()
+    return _SHARED_CHAIN
+
 class RealEstateRAGInput(BaseModel):
     """Input schema for the Real Estate RAG Tool."""
     query: str = Field(
@@ -33,8 +48,14 @@ class RealEstateRAGTool(BaseTool):
     )
     args_schema: Type[BaseModel] = RealEstateRAGInput
 
-    # The RAG chain is initialized once and reused
-    rag_chain: RealEstateRAGChain = Field(default_factory=RealEstateRAGChain)
+    # The RAG chain is initialized once per process and shared by all tool instances;
+    # pass one explicitly to use a differently configured chain
+    rag_chain: Optional[RealEstateRAGChain] = None
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        if self.rag_chain is None:
+            self.rag_chain = _get_chain()
 
     def _run(self, query: str) -> Any:
         """Executes the RAG query on real estate documents."""
@@ -47,71 +68,67 @@ class RealEstateRAGTool(BaseTool):
         try:
             # Invoke RAG chain for retrieval
             result = self.rag_chain.invoke({"query": query})
-            
-            answer = result["answer"]
-            context = result.get("context", "")
-            pdf_results = result.get("pdf_results", {})
-            csv_results = result.get("csv_results", {})
-            
-            # Extract citation information
-            citations = []
-            
-            # Process PDF citations
-            if pdf_results.get('metadatas') and pdf_results['metadatas'][0]:
-                for metadata in pdf_results['metadatas'][0]:
-                    if metadata:
-                        citations.append({
-                            "type": "pdf",
-                            "filename": metadata.get("filename", "unknown.pdf"),
-                            "page_number": metadata.get("page_number", "unknown")
-                        })
-            
-            # Process CSV citations
-            if csv_results.get('metadatas') and csv_results['metadatas'][0]:
-                for metadata in csv_results['metadatas'][0]:
-                    if metadata:
-                        citations.append({
-                            "type": "csv", 
-                            "filename": metadata.get("filename", "unknown.csv"),
-                            "row": metadata.get("row", "unknown")
-                        })
-            
-            # Create response metadata
-            metadata = {
-                "tool_name": self.name,
-                "query": query,
-                "status": "completed",
-                "answer_length": len(answer),
-                "context_length": len(context),
-                "source": "real_estate_document_database",
-                "citations": citations,
-                "pdf_results_count": len(pdf_results.get('documents', [[]])[0]) if pdf_results.get('documents') else 0,
-                "csv_results_count": len(csv_results.get('documents', [[]])[0]) if csv_results.get('documents') else 0
-            }
-            
-            print("✅ Real Estate RAG Tool execution finished successfully.")
-            print(f"📄 Found {metadata['pdf_results_count']} PDF results")
-            print(f"📊 Found {metadata['csv_results_count']} CSV results")
-            print(f"📝 Generated answer with {len(answer)} characters")
-            
-            # Return answer and metadata
-            return answer, metadata
+            return self._format_result(query, result)
         
         except Exception as e:
-            print(f"❌ Real Estate RAG Tool execution failed: {e}")
-            error_metadata = {
-                "tool_name": self.name,
-                "query": query,
-                "status": "failed",
-                "error": str(e)
-            }
-            return f"Real estate document search failed with error: {str(e)}", error_metadata
+            return self._format_error(query, e)
 
     async def _arun(self, query: str) -> Any:
-        """Asynchronously executes the RAG query."""
-        # In a real high-concurrency scenario, rag_chain.invoke should be made asynchronous.
-        # For now we wrap the sync version.
-        return self._run(query=query)
+        """Asynchronously executes the RAG query without blocking the event loop."""
+        if not self.rag_chain:
+            raise RuntimeError("RAG system is not initialized.")
+            
+        print(f"🔍 Executing Real Estate RAG Tool (async)...")
+        print(f"   Query: {query}")
+
+        try:
+            result = await self.rag_chain.ainvoke({"query": query})
+            return self._format_result(query, result)
+        
+        except Exception as e:
+            return self._format_error(query, e)
+
+    def _format_result(self, query: str, result: dict) -> Any:
+        """Build the (answer, metadata) tool output from a RAG chain result."""
+        answer = result["answer"]
+        context = result.get("context", "")
+        pdf_results = result.get("pdf_results", {})
+        csv_results = result.get("csv_results", {})
+        
+        # Citations are collected by the chain in the same pass that builds the context
+        citations = result.get("citations", [])
+        
+        # Create response metadata
+        metadata = {
+            "tool_name": self.name,
+            "query": query,
+            "status": "completed",
+            "answer_length": len(answer),
+            "context_length": len(context),
+            "source": "real_estate_document_database",
+            "citations": citations,
+            "pdf_results_count": len(pdf_results.get('documents', [[]])[0]) if pdf_results.get('documents') else 0,
+            "csv_results_count": len(csv_results.get('documents', [[]])[0]) if csv_results.get('documents') else 0
+        }
+        
+        print("✅ Real Estate RAG Tool execution finished successfully.")
+        print(f"📄 Found {metadata['pdf_results_count']} PDF results")
+        print(f"📊 Found {metadata['csv_results_count']} CSV results")
+        print(f"📝 Generated answer with {len(answer)} characters")
+        
+        # Return answer and metadata
+        return answer, metadata
+
+    def _format_error(self, query: str, error: Exception) -> Any:
+        """Build the (message, metadata) tool output for a failed query."""
+        print(f"❌ Real Estate RAG Tool execution failed: {error}")
+        error_metadata = {
+            "tool_name": self.name,
+            "query": query,
+            "status": "failed",
+            "error": str(error)
+        }
+        return f"Real estate document search failed with error: {str(error)}", error_metadata
 
     def get_database_stats(self) -> dict:
         """Get database statistics information."""
@@ -2,15 +2,20 @@ import gradio as gr
 import os
 import sys
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
 
 # Allow imports from project root
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from langchain_core.messages import AIMessage, HumanMessage
+
 from dataroom.agent.agent import Agent
+from dataroom.agent.exec_cache import ExecCache
 from dataroom.tools import RealEstateRAGTool
 from dataroom.utils.utils import load_txt_prompts_from_file
-from dataroom.rag.build_database import VectorDatabaseManager
+from dataroom.rag.build_database import VectorDatabaseManager, get_db_manager
+from dataroom.rag.config import get_rag_config
+from dataroom.rag.query_cache import QueryCache
 
 class RealEstateInterface:
     """Simplified interface: single chat + file upload"""
@@ -18,6 +23,13 @@ class RealEstateInterface:
     def __init__(self, agent: Optional[Agent] = None):
         self.agent = agent
         self.db_manager: Optional[VectorDatabaseManager] = None
+        # In-memory front of the exec cache (same keys; exact text only); skips the agent entirely
+        self._answer_cache = QueryCache(similarity_threshold=None)
+        # Same across restarts; keys include the recent conversation, the model and the document set
+        cache_config = get_rag_config().get("query_cache", {})
+        self._exec_cache = ExecCache(cache_config.get("exec_cache_path", "./chroma_db/exec_cache.sqlite"))
+        self._exec_cache_ttl = cache_config.get("exec_cache_ttl_seconds")
+        self._model_signature: Optional[str] = None
 
     # ---- Core Functions ----
     def initialize_agent(self) -> bool:
@@ -48,23 +60,73 @@ class RealEstateInterface:
             print(f"Init error: {e}")
             return False
 
-    def chat_with_agent(self, message: str, history: List[List[str]]):
+    def chat_with_agent(self, message: str, history: List[List[str]]) -> Iterator[Tuple[str, List[List[str]]]]:
+        """Answer a message, yielding the updated history as the answer streams in."""
         if not self.agent:
-            return "❌ Agent not initialized", history
+            yield "❌ Agent not initialized", history
+            return
         if not message.strip():
-            return "", history
+            yield "", history
+            return
+        # Row first, so a failure below reports on this turn, not the previous one
+        history.append([message, "..."])
+        yield "", history
         try:
-            history.append([message, "..."])
-            response = self.agent.workflow.invoke(
-                {"messages": [("user", message)]},
-                config={"configurable": {"thread_id": "single_thread"}}
+            config = {"configurable": {"thread_id": "single_thread"}}
+            
+            # Same question after the same recent turns, against the same documents
+            # (this session or an earlier one): answer without calling the model
+            if self.db_manager is None:
+                self.db_manager = get_db_manager()
+            if self._model_signature is None:
+                self._model_signature = ExecCache.model_signature(self.agent.model, self.agent.system_prompt)
+            exec_key = ExecCache.key(
+                message,
+                self.db_manager.signature(),
+                ExecCache.thread_signature(self.agent.workflow.get_state(config).values.get("messages", [])),
+                self._model_signature
             )
-            answer = response["messages"][-1].content
-            history[-1][1] = answer
-            return "", history
+            cached = self._answer_cache.get(exec_key)
+            stored = cached["answer"] if cached is not None else self._exec_cache.get(exec_key, max_age=self._exec_cache_ttl)
+            if stored is not None:
+                self._answer_cache.put(exec_key, {"answer": stored})
+                # Keep the agent's memory in step with the chat history
+                self.agent.workflow.update_state(
+                    config,
+                    {"messages": [HumanMessage(content=message), AIMessage(content=stored)]},
+                    as_node="process"
+                )
+                history[-1][1] = stored
+                yield "", history
+                return
+
+            answer, step = "", None
+            for chunk, metadata in self.agent.workflow.stream(
+                {"messages": [("user", message)]},
+                config=config,
+                stream_mode="messages"
+            ):
+                # Only model output; tool results are streamed from the "execute" node
+                if metadata.get("langgraph_node") != "process" or not isinstance(chunk.content, str):
+                    continue
+                # A new model turn (after tool calls) starts a new answer
+                if metadata.get("langgraph_step") != step:
+                    answer, step = "", metadata.get("langgraph_step")
+                if chunk.content:
+                    answer += chunk.content
+                    history[-1][1] = answer
+                    yield "", history
+            # Models that don't stream tokens: take the final message from the graph state
+            final = self.agent.workflow.get_state(config).values["messages"][-1].content
+            if final != answer:
+                history[-1][1] = final
+                yield "", history
+            if isinstance(final, str):
+                self._answer_cache.put(exec_key, {"answer": final})
+                self._exec_cache.put(exec_key, final)
         except Exception as e:
             history[-1][1] = f"❌ Error: {e}"
-            return "", history
+            yield "", history
 
     def upload_document(self, file) -> str:
         if not file:
@@ -73,18 +135,20 @@ class RealEstateInterface:
             if self.agent is None:
                 self.initialize_agent()  # Ensure tools available
             if self.db_manager is None:
-                self.db_manager = VectorDatabaseManager()
+                self.db_manager = get_db_manager()
             file_path = file.name
             suffix = Path(file_path).suffix.lower()
             if suffix == ".pdf":
                 result = self.db_manager.add_pdf_document(file_path)
                 if "error" in result:
                     return f"❌ PDF failed: {result['error']}"
+                self._answer_cache.clear()
                 return f"✅ PDF added, pages: {result.get('pages_added', 0)}"
             elif suffix == ".csv":
                 result = self.db_manager.add_csv_document(file_path)
                 if "error" in result:
                     return f"❌ CSV failed: {result['error']}"
+                self._answer_cache.clear()
                 return f"✅ CSV added, chunks: {result.get('chunks_added', 0)}"
             return f"❌ Unsupported file type: {suffix}"
         except Exception as e:
@@ -129,7 +193,8 @@ class RealEstateInterface:
                 return "✅ Ready" if ok else "❌ Initialization failed"
 
             def _send(msg, history):
-                return self.chat_with_agent(msg, history)
+                # Generator handler: Gradio streams every yielded history to the Chatbot
+                yield from self.chat_with_agent(msg, history)
 
             def _clear():
                 return "", []
@@ -140,7 +205,7 @@ class RealEstateInterface:
             def _list_files():
                 try:
                     if self.db_manager is None:
-                        self.db_manager = VectorDatabaseManager()
+                        self.db_manager = get_db_manager()
                     data = self.db_manager.list_documents()
                     if "error" in data:
                         return f"❌ {data['error']}"
@@ -2,13 +2,23 @@
 Utility functions for dataroom.
 """
 
+import functools
 from pathlib import Path
 from typing import Dict, Any
 
+
+@functools.lru_cache(maxsize=16)
+def _read_prompt(path: str, mtime_ns: int, size: int) -> str:
+    """Read a prompt file; the (mtime, size) key invalidates the entry when the file changes."""
+    return Path(path).read_text(encoding='utf-8').strip()
+
+
 def load_txt_prompts_from_file(file_path: str) -> Dict[str, str]:
     """
     Load prompts from a text file.
     
+    The file is read again only when it changed since the last call.
+    
     Args:
         file_path: Path to the prompt file
         
@@ -17,12 +27,13 @@ def load_txt_prompts_from_file(file_path: str) -> Dict[str, str]:
     """
     prompt_file = Path(file_path)
     
-    if not prompt_file.exists():
-        raise FileNotFoundError(f"Prompt file not found: {file_path}")
+    try:
+        stat = prompt_file.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Prompt file not found: {file_path}") from None
     
     # Read the entire file content as system prompt
-    with open(prompt_file, 'r', encoding='utf-8') as f:
-        content = f.read().strip()
+    content = _read_prompt(str(prompt_file.resolve()), stat.st_mtime_ns, stat.st_size)
     
     return {
         "system_prompt": content
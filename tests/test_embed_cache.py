@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent content-hash embedding cache.
+"""
+
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dataroom.rag.embed_cache import EmbedCache
+
+
+class CountingEmbedder:
+    """Deterministic embed function that records which texts it was asked for."""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        rng = np.random.default_rng(len(self.calls))
+        return rng.standard_normal((len(texts), self.dim)).astype(np.float32) / 3
+
+
+def test_round_trip_computes_each_text_once(tmp_path):
+    embed = CountingEmbedder()
+    cache = EmbedCache(str(tmp_path / "cache.sqlite"), namespace="model")
+
+    first = cache.get_or_compute(["a", "b", "a"], embed)
+    second = cache.get_or_compute(["b", "a", "c"], embed)
+
+    assert embed.calls == [["a", "b"], ["c"]]
+    assert np.array_equal(first[0], first[2])
+    assert np.array_equal(second[0], first[1])
+    assert np.array_equal(second[1], first[0])
+    cache.close()
+
+
+def test_survives_reopen_and_separates_namespaces(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    embed = CountingEmbedder()
+    cache = EmbedCache(path, namespace="model")
+    stored = cache.get_or_compute(["a"], embed)
+    cache.close()
+
+    reopened = EmbedCache(path, namespace="model")
+    assert np.array_equal(reopened.get_or_compute(["a"], embed), stored)
+    assert len(embed.calls) == 1
+
+    other_model = EmbedCache(path, namespace="other")
+    other_model.get_or_compute(["a"], embed)
+    assert len(embed.calls) == 2
+    reopened.close()
+    other_model.close()
+
+
+def test_hit_and_miss_return_the_same_values(tmp_path):
+    for dtype in (np.float16, np.float32):
+        embed = CountingEmbedder()
+        cache = EmbedCache(str(tmp_path / f"cache-{np.dtype(dtype).name}.sqlite"), dtype=dtype)
+
+        miss = cache.get_or_compute(["a", "b"], embed, dtype=np.float32)
+        hit = cache.get_or_compute(["a", "b"], embed, dtype=np.float32)
+
+        assert len(embed.calls) == 1
+        assert miss.dtype == hit.dtype == np.float32
+        assert np.array_equal(miss, hit)
+        cache.close()
+
+
+def test_float32_storage_is_not_rounded(tmp_path):
+    embed = CountingEmbedder()
+    expected = CountingEmbedder()(["a"])
+    cache = EmbedCache(str(tmp_path / "cache.sqlite"), dtype=np.float32)
+
+    cache.get_or_compute(["a"], embed)
+    hit = cache.get_or_compute(["a"], embed, dtype=np.float32)
+
+    assert np.array_equal(hit[0], expected[0])
+    cache.close()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent agent answer cache.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dataroom.agent import exec_cache
+from dataroom.agent.exec_cache import ExecCache
+
+
+def test_get_put_and_reopen(tmp_path):
+    path = str(tmp_path / "exec.sqlite")
+    cache = ExecCache(path)
+    key = ExecCache.key("What is the price?", "docs-1")
+
+    assert cache.get(key) is None
+    cache.put(key, "100k")
+    cache.put(key, "120k")
+    assert cache.get(key) == "120k"
+    cache.close()
+
+    reopened = ExecCache(path)
+    assert reopened.get(key) == "120k"
+    reopened.close()
+
+
+def test_max_age(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(exec_cache.time, "time", lambda: now[0])
+    cache = ExecCache(str(tmp_path / "exec.sqlite"))
+    cache.put("k", "answer")
+
+    now[0] += 60
+    assert cache.get("k", max_age=120) == "answer"
+    assert cache.get("k", max_age=30) is None
+    cache.close()
+
+
+def test_key_depends_on_documents_and_conversation():
+    first = [SimpleNamespace(type="human", content="List the properties"),
+             SimpleNamespace(type="ai", content="A and B")]
+    other = [SimpleNamespace(type="human", content="List the tenants"),
+             SimpleNamespace(type="ai", content="C and D")]
+
+    assert ExecCache.thread_signature([]) == ""
+    assert ExecCache.thread_signature(first) != ExecCache.thread_signature(other)
+
+    base = ExecCache.key("What about the second one?", "docs-1", ExecCache.thread_signature(first))
+    assert base == ExecCache.key(" what about the second one? ", "docs-1", ExecCache.thread_signature(first))
+    assert base != ExecCache.key("What about the second one?", "docs-2", ExecCache.thread_signature(first))
+    assert base != ExecCache.key("What about the second one?", "docs-1", ExecCache.thread_signature(other))
+
+
+def test_key_depends_on_model_and_system_prompt():
+    llm = SimpleNamespace(model="gemini-2.5-flash-lite", temperature=0.7, top_p=0.95)
+    bound = SimpleNamespace(bound=llm, kwargs={"tools": []})
+    signature = ExecCache.model_signature(llm, "You are an analyst.")
+
+    assert ExecCache.model_signature(bound, "You are an analyst.") == signature
+    assert ExecCache.model_signature(llm, "You are a broker.") != signature
+    assert ExecCache.model_signature(SimpleNamespace(model="gemini-2.5-flash-lite", temperature=0.2, top_p=0.95),
+                                     "You are an analyst.") != signature
+
+    base = ExecCache.key("Total price?", "docs-1", "", signature)
+    assert base != ExecCache.key("Total price?", "docs-1", "", ExecCache.model_signature(llm, "You are a broker."))
+    assert base != ExecCache.key("Total price?", "docs-1")
+
+
+def test_thread_signature_uses_last_messages_only():
+    tail = [SimpleNamespace(type="human", content=str(i)) for i in range(6)]
+    older = [SimpleNamespace(type="human", content="old")]
+    assert ExecCache.thread_signature(older + tail) == ExecCache.thread_signature(tail)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-file manifest and the document-set signature.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import chromadb
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dataroom.rag.build_database import VectorDatabaseManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Manager over empty collections in a temporary store (no config / embedder needed)."""
+    client = chromadb.PersistentClient(path=str(tmp_path / "db"))
+    manager = VectorDatabaseManager.__new__(VectorDatabaseManager)
+    manager.client = client
+    manager.pdf_collection = client.get_or_create_collection("pdf_documents")
+    manager.csv_collection = client.get_or_create_collection("csv_documents")
+    manager._manifest_path = tmp_path / "db" / "manifest.json"
+    manager._manifest_lock = threading.Lock()
+    manager._generation = 0
+    manager._save_manifest({"pdf": {}, "csv": {}})
+    return manager
+
+
+def add_pdf(manager, filename, document_id, pages=2):
+    manager.pdf_collection.add(
+        ids=[f"{document_id}_p{i}" for i in range(pages)],
+        documents=[f"page {i}" for i in range(pages)],
+        embeddings=[[float(i), 1.0, 0.0] for i in range(pages)],
+        metadatas=[{"document_id": document_id} for _ in range(pages)]
+    )
+    manager._update_manifest([("pdf", filename, document_id, pages, "2024-01-01T00:00:00")])
+
+
+def test_signature_changes_on_add_and_delete(manager):
+    empty = manager.signature()
+    assert manager.signature() == empty
+
+    add_pdf(manager, "a.pdf", "pdf_a")
+    added = manager.signature()
+    assert added != empty
+
+    manager.pdf_collection.delete(ids=["pdf_a_p0", "pdf_a_p1"])
+    manager.remove_from_manifest("pdf_a")
+    assert manager.signature() == empty
+
+
+def test_signature_changes_on_reupload(manager):
+    add_pdf(manager, "a.pdf", "pdf_a")
+    before = manager.signature()
+    manager._update_manifest([("pdf", "a.pdf", "pdf_a", 2, "2024-02-01T00:00:00")])
+    assert manager.signature() != before
+
+
+def test_change_token_tracks_writes(manager):
+    before = manager.change_token()
+    assert manager.change_token() == before
+
+    add_pdf(manager, "a.pdf", "pdf_a")
+    added = manager.change_token()
+    assert added != before
+
+    manager.remove_from_manifest("pdf_a")
+    assert manager.change_token() != added
+
+
+def test_change_token_sees_other_managers(manager, tmp_path):
+    other = VectorDatabaseManager.__new__(VectorDatabaseManager)
+    other._manifest_path = manager._manifest_path
+    other._manifest_lock = threading.Lock()
+    other._generation = 0
+    before = other.change_token()
+
+    manager._invalidate_manifest()
+    assert other.change_token() != before
+
+
+def test_remove_from_manifest(manager):
+    add_pdf(manager, "a.pdf", "pdf_a")
+    add_pdf(manager, "b.pdf", "pdf_b")
+    assert manager.manifest_lookup("pdf", "a.pdf") == (True, "pdf_a")
+
+    manager.remove_from_manifest("pdf_a")
+    assert manager.manifest_lookup("pdf", "a.pdf") == (True, None)
+    assert manager.manifest_lookup("pdf", "b.pdf") == (True, "pdf_b")
+
+
+def test_remove_unknown_id_drops_manifest(manager):
+    # Scan-bootstrapped entries carry no document id; the manifest is rebuilt later
+    manager._save_manifest({"pdf": {"a.pdf": {"total_pages": 2}}, "csv": {}})
+    assert manager.manifest_lookup("pdf", "a.pdf") == (False, None)
+
+    manager.remove_from_manifest("pdf_a")
+    assert not manager._manifest_path.exists()
+    assert manager.manifest_lookup("pdf", "b.pdf") == (False, None)
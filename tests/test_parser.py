@@ -153,6 +153,21 @@ def test_environment():
     
     return True
 
+def test_csv_lazy_stats_behave_like_plain_dict(tmp_path):
+    """Lazily computed statistics show up in keys, items and dict() copies."""
+    csv_file = tmp_path / "prices.csv"
+    csv_file.write_text("property,price\nA,100\nB,200\n")
+    result = parse_csv(str(csv_file), include_markdown=False)
+    
+    for key in ("data_types", "sample_data", "summary_stats"):
+        assert key in result
+        assert key in result.keys()
+        assert key in dict(result)
+        assert key in dict(result.items())
+    assert dict(result) == result
+    assert len(result) == len(dict(result))
+    assert result["sample_data"][0]["property"] == "A"
+
 def main():
     """Run all tests."""
     print("Document Parser Test Suite")
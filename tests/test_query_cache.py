@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory RAG answer cache.
+"""
+
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dataroom.rag import query_cache
+from dataroom.rag.query_cache import QueryCache
+
+
+def test_key_ignores_case_and_surrounding_whitespace():
+    assert QueryCache.key("  Total Price? ") == QueryCache.key("total price?")
+    assert QueryCache.key("price of property A") != QueryCache.key("price of property B")
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    cache = QueryCache(ttl_seconds=10)
+
+    cache.put("k", {"answer": "a"})
+    now[0] += 9
+    assert cache.get("k") == {"answer": "a"}
+    now[0] += 2
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_size=2)
+    cache.put("a", {"answer": "a"})
+    cache.put("b", {"answer": "b"})
+    cache.get("a")
+    cache.put("c", {"answer": "c"})
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_similar_query_hits_above_threshold_only():
+    cache = QueryCache(similarity_threshold=0.97)
+    base = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    cache.put("k", {"answer": "a"}, base)
+
+    close = np.array([1.0, 0.1, 0.0], dtype=np.float32)   # cosine ~0.995
+    far = np.array([1.0, 1.0, 0.0], dtype=np.float32)     # cosine ~0.707
+    assert cache.get_similar(close * 5) == {"answer": "a"}
+    assert cache.get_similar(far) is None
+
+
+def test_similarity_lookup_can_be_disabled_and_cleared():
+    embedding = np.array([0.0, 1.0], dtype=np.float32)
+    disabled = QueryCache(similarity_threshold=None)
+    disabled.put("k", {"answer": "a"}, embedding)
+    assert disabled.get_similar(embedding) is None
+    assert disabled.get("k") == {"answer": "a"}
+
+    cache = QueryCache()
+    cache.put("k", {"answer": "a"}, embedding)
+    cache.clear()
+    assert cache.get("k") is None
+    assert cache.get_similar(embedding) is None